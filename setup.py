@@ -41,8 +41,17 @@ setup(
     include_package_data=True,
     install_requires=[
         "slumber==0.7.1",
+        "futures; python_version < '3'",
     ],
     tests_require=tests_require,
     test_suite='sylvadbclient.tests',
-    extras_require={},
+    extras_require={
+        "async": ["aiohttp"],
+        "numpy": ["numpy"],
+        "pandas": ["numpy", "pandas"],
+        "arrow": ["pyarrow"],
+        "zstd": ["zstandard"],
+        "opentelemetry": ["opentelemetry-api"],
+        "json": ["orjson"],
+    },
 )
@@ -1,4 +1,11 @@
-from .api import API, Graph  # noqa
+from .api import API, Graph, PushError, TemporaryId  # noqa
+from .cache import Cache, DiskCache  # noqa
+from .metrics import Metrics, OpenTelemetryHooks  # noqa
+from .session import (  # noqa
+    Compression, NotModified, RateLimiter, RetryPolicy, get_session,
+    new_session,
+)
+from .streams import read_export  # noqa
 
 __version__ = "0.0.1"
 __author__ = "Javier de la Rosa"
@@ -0,0 +1,644 @@
+# -*- coding: utf-8 -*-
+"""
+Asynchronous clients for asyncio, backed by aiohttp (Python 3.6+ only):
+
+    async with AsyncGraph("graph-1", auth=token) as graph:
+        await graph.nodes.types.pull()
+        countries = graph.nodes["country"]
+        async for country in countries:
+            ...
+"""
+from __future__ import absolute_import, unicode_literals
+import asyncio
+import hashlib
+import json
+import time
+from contextlib import contextmanager
+try:
+    import contextvars
+except ImportError:
+    contextvars = None
+
+from slumber import exceptions
+from slumber.utils import url_join
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from .api import (
+    API, Graph, Data, BaseCollection, DataCollection, TypeCollection,
+    PropertyCollection, SYLVADB_API, NODE, RELATIONSHIP, CHUNK_SIZE, WORKERS,
+    _Pager,
+)
+from .cache import get_cache, origin
+from .metrics import Metrics
+from .session import POOL_MAXSIZE
+from .streams import STREAM_CHUNK_SIZE, open_stream, read_chunks
+
+CONTENT_TYPE = "application/json"
+# Endpoint of the requests of each task, unnamed before Python 3.7
+_endpoint = (contextvars.ContextVar("sylvadb_endpoint", default=None)
+             if contextvars is not None else None)
+
+
+async def _gather(func, calls, workers):
+    """
+    Await `func` with the arguments in `calls`, a dictionary of positional
+    arguments by key, with up to `workers` calls running concurrently.
+    Return the results and the exceptions raised, both by key
+    """
+    semaphore = asyncio.Semaphore(workers)
+    results = {}
+    errors = {}
+
+    async def call(key, args):
+        async with semaphore:
+            try:
+                results[key] = await func(*args)
+            except Exception as e:
+                errors[key] = e
+
+    await asyncio.gather(*[call(key, args) for key, args in calls.items()])
+    return results, errors
+
+
+async def _chunks(iterable):
+    """Return an asynchronous generator over an iterable of chunks"""
+    for chunk in iterable:
+        yield chunk
+
+
+def _unsupported(name):
+    """Return a method of the sync clients not supported in asyncio"""
+    def method(self, *args, **kwargs):
+        raise NotImplementedError(
+            "{} is not supported by the asyncio clients, use {} of the sync "
+            "clients instead".format(name, name))
+    method.__name__ = str(name)
+    return method
+
+
+class AsyncSession(object):
+    """
+    Session used by an AsyncAPI. It sends the requests with its token
+    through an `aiohttp.ClientSession`, that can be shared among APIs
+    """
+
+    def __init__(self, session=None, token=None, metrics=None):
+        if aiohttp is None:
+            raise ImportError("aiohttp is required for the async clients")
+        self._session = session
+        self._own_session = session is None
+        self.headers = {"Authorization": "Token {0}".format(token)}
+        self.metrics = metrics
+        self.hooks = {"before": [], "after": []}
+
+    def __repr__(self):
+        return "<SylvaDB AsyncSession at {}>".format(hex(id(self)))
+
+    @contextmanager
+    def endpoint(self, name):
+        """Name the endpoint of the requests of the task in the context"""
+        if _endpoint is None:
+            yield
+            return
+        token = _endpoint.set(name)
+        try:
+            yield
+        finally:
+            _endpoint.reset(token)
+
+    async def request(self, method, url, **kwargs):
+        """
+        Send a request, calling the hooks and recording metrics. Return the
+        response and its content
+        """
+        if self._session is None:
+            # Created here to be bound to the running event loop
+            connector = aiohttp.TCPConnector(limit_per_host=POOL_MAXSIZE)
+            self._session = aiohttp.ClientSession(connector=connector)
+        headers = dict(kwargs.pop("headers", {}), **self.headers)
+        request = {
+            "endpoint": ((_endpoint.get() if _endpoint is not None else None)
+                         or method.lower()),
+            "method": method,
+            "url": url,
+            "attempt": 0,
+        }
+        for hook in self.hooks["before"]:
+            hook(request)
+        response = None
+        content = b""
+        start = time.time()
+        try:
+            async with self._session.request(method, url, headers=headers,
+                                             **kwargs) as response:
+                content = await response.read()
+            return response, content
+        except Exception as e:
+            request["error"] = e
+            raise
+        finally:
+            seconds = time.time() - start
+            if self.metrics is not None:
+                data = kwargs.get("data")
+                sent = len(data) if isinstance(data, (bytes, str)) else 0
+                self.metrics.record(
+                    request["endpoint"],
+                    response.status if response is not None else None,
+                    seconds, sent, len(content))
+            for hook in self.hooks["after"]:
+                hook(request, response, seconds)
+
+    async def close(self):
+        """Close the `aiohttp.ClientSession` if it was created here"""
+        if self._own_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class AsyncResource(object):
+    """Asynchronous counterpart of a slumber resource"""
+
+    def __init__(self, base_url, session):
+        self._base_url = base_url
+        self._session = session
+
+    def __getattr__(self, item):
+        if item.startswith("_"):
+            raise AttributeError(item)
+        return AsyncResource(url_join(self._base_url, item), self._session)
+
+    def __call__(self, id=None):
+        if id is None:
+            return self
+        return AsyncResource(url_join(self._base_url, id), self._session)
+
+    def url(self):
+        url = self._base_url
+        if not url.endswith("/"):
+            url = url + "/"
+        return url
+
+    async def _request(self, method, data=None, params=None, raw=False):
+        url = self.url()
+        headers = {"accept": CONTENT_TYPE, "content-type": CONTENT_TYPE}
+        if data is not None and not raw:
+            data = json.dumps(data)
+        response, content = await self._session.request(
+            method, url, data=data, params=params, headers=headers)
+        if 400 <= response.status <= 499:
+            exception_class = (exceptions.HttpNotFoundError
+                               if response.status == 404
+                               else exceptions.HttpClientError)
+            raise exception_class(
+                "Client Error {}: {}".format(response.status, url),
+                response=response, content=content)
+        elif 500 <= response.status <= 599:
+            raise exceptions.HttpServerError(
+                "Server Error {}: {}".format(response.status, url),
+                response=response, content=content)
+        return response, content
+
+    def _process_response(self, response, content):
+        if response.status in (204, 205) or not content:
+            return None
+        content_type = response.headers.get("content-type", "")
+        if content_type.split(";")[0].strip() == CONTENT_TYPE:
+            return json.loads(content.decode("utf-8"))
+        return content
+
+    async def get(self, **kwargs):
+        return self._process_response(
+            *(await self._request("GET", params=kwargs)))
+
+    async def post(self, data=None, **kwargs):
+        return self._process_response(
+            *(await self._request("POST", data=data, params=kwargs)))
+
+    async def put(self, data=None, **kwargs):
+        return self._process_response(
+            *(await self._request("PUT", data=data, params=kwargs)))
+
+    async def patch(self, data=None, **kwargs):
+        return self._process_response(
+            *(await self._request("PATCH", data=data, params=kwargs)))
+
+    async def delete(self, **kwargs):
+        await self._request("DELETE", params=kwargs)
+        return True
+
+
+class AsyncAPI(API):
+    """
+    API whose methods are coroutines. It has the same methods as `API`,
+    since they build the same resources, only requested asynchronously,
+    except for the streamed exports and the conditional requests
+    """
+    export_graph_stream = _unsupported("export_graph_stream")
+    export_schema_stream = _unsupported("export_schema_stream")
+    export_data_stream = _unsupported("export_data_stream")
+    conditional = _unsupported("conditional")
+
+    def __init__(self, token, graph_slug=None, session=None, cache=True,
+                 metrics=True):
+        # Metrics of the requests by endpoint, that can be shared among APIs
+        if metrics is True:
+            metrics = Metrics()
+        self._session = AsyncSession(session, token, metrics or None)
+        self._api = AsyncResource(SYLVADB_API, self._session)
+        self._slug = graph_slug
+        self._cache = get_cache(cache)
+        self._origin = origin(SYLVADB_API, session)
+        self._token_hash = hashlib.sha1(
+            "{0}".format(token).encode("utf-8")).hexdigest()
+
+    def __repr__(self):
+        return "<SylvaDB AsyncAPI at {}>".format(hex(id(self)))
+
+    async def _cached_call(self, func, args, kwargs):
+        """Await the method `func`, using the cache if possible"""
+        if self._cache is None or self._cache.ttl(func.__name__) is None:
+            with self._session.endpoint(func.__name__):
+                return await func(self, *args, **kwargs)
+        key = self._cache_key(func, args, kwargs)
+        response = self._cache.get(key)
+        if response is None:
+            with self._session.endpoint(func.__name__):
+                response = await func(self, *args, **kwargs)
+            self._cache.set(key, response)
+        return response
+
+    async def _invalidating_call(self, func, args, kwargs):
+        """Await the method `func`, invalidating the cache for the graph"""
+        try:
+            with self._session.endpoint(func.__name__):
+                return await func(self, *args, **kwargs)
+        finally:
+            if self._cache is not None:
+                self._cache.invalidate(self._slug)
+
+    async def _upload(self, resource, data, method="PUT"):
+        """
+        Send `data` to a resource. It can be JSON serializable, bytes, a
+        binary file object, or an iterable or asynchronous iterable of
+        bytes, uploaded with chunked transfer encoding
+        """
+        if isinstance(data, (dict, list)):
+            data = json.dumps(data)
+        elif not (isinstance(data, (bytes, str)) or hasattr(data, "read")
+                  or hasattr(data, "__aiter__")):
+            data = _chunks(data)
+        return resource._process_response(
+            *(await resource._request(method, data=data, raw=True)))
+
+    async def close(self):
+        """Close the connections of the API"""
+        await self._session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+class AsyncGraph(Graph):
+    """
+    Graph class for asyncio. It is not pulled on creation, so use
+    `await graph.pull()`, or `async with` to pull it and close it after.
+    Exports to files and batches are not supported
+    """
+    export_to = _unsupported("export_to")
+    push_all = _unsupported("push_all")
+    batch = _unsupported("batch")
+
+    def __init__(self, graph_slug, auth, session=None):
+        self._api = AsyncAPI(token=auth, graph_slug=graph_slug,
+                             session=session)
+        self._attrs = dict(self._attrs)
+        self._changed = set()
+        self.nodes = AsyncData(api=self._api, mode=NODE)
+        self.relationships = AsyncData(api=self._api, mode=RELATIONSHIP)
+        self.rels = self.relationships
+
+    async def push(self):
+        """Push changes from the Graph properties to the server"""
+        if self._changed:
+            params = dict((attr, self._attrs[attr]) for attr in self._changed)
+            await self._api.patch_graph(params=params)
+            self._changed = set()
+
+    async def pull(self):
+        """Pull changes to the Graph properties from the server"""
+        _attrs = await self._api.get_graph()
+        for prop in self._attrs:
+            self._attrs[prop] = _attrs[prop]
+        self._changed = set()
+
+    async def import_from(self, path_or_fileobj, data=True, schema=True,
+                          compression=None, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        Import Graph data, schema or both from an export in a path or
+        binary file object, uploading it in chunks of `chunk_size` bytes.
+        The compression, 'gzip' or 'zstd', is inferred from the extension of
+        the path if not set
+        """
+        with open_stream(path_or_fileobj, "rb", compression) as stream:
+            chunks = read_chunks(stream, chunk_size)
+            if data and not schema:
+                response = await self._api.import_data(chunks)
+            elif not data and schema:
+                response = await self._api.import_schema(chunks)
+            else:
+                response = await self._api.import_graph(chunks)
+        await self.pull()
+        return response
+
+    async def destroy(self):
+        """Delete all contents and remove the Graph"""
+        return await self._api.delete_graph()
+
+    async def export(self, data=True, schema=True):
+        """Export Graph data, schema or both"""
+        return await super(AsyncGraph, self).export(data, schema)
+
+    async def close(self):
+        """Close the connections of the Graph"""
+        await self._api.close()
+
+    async def __aenter__(self):
+        await self.pull()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+class AsyncData(Data):
+    """
+    Data class for asyncio. Types are only checked when accessing a data
+    collection if they were pulled before
+    """
+
+    @property
+    def types(self):
+        """Lazy loading property to list data types (node and rel types)"""
+        if self._types is None:
+            self._types = AsyncTypeCollection(self._api, self._mode)
+        return self._types
+
+    def __getitem__(self, datatype):
+        """
+        Return an `AsyncDataCollection` of type `datatype`, referring to a
+        node type or relationship type. If types were pulled and it is not
+        found, a `KeyError` is returned
+        """
+        _key = self.__keytransform__(datatype)
+        if self.types._data is not None:
+            # Types can be referred by slug or by name
+            _key = self.types[_key]["slug"]
+        if _key not in self._datacols:
+            self._datacols[_key] = AsyncDataCollection(self._api, self._mode,
+                                                       _key)
+        return self._datacols[_key]
+
+
+class AsyncCollectionMixin(object):
+    """
+    Access to the data of asynchronous collections. Reading and counting
+    work on pulled data, so `await collection.pull()` first
+    """
+
+    @property
+    def data(self):
+        """The pulled data (list of nodes and relationships)"""
+        if self._data is None:
+            raise RuntimeError("{} is not pulled, use 'await "
+                               "collection.pull()' first".format(self))
+        return self._data
+
+    def __getitem__(self, key):
+        return BaseCollection.__getitem__(self, key)
+
+    def __iter__(self):
+        return BaseCollection.__iter__(self)
+
+    def __len__(self):
+        return BaseCollection.__len__(self)
+
+
+class AsyncDataCollection(AsyncCollectionMixin, DataCollection):
+    """DataCollection class for asyncio"""
+
+    async def _fetch(self, limit=None, offset=None, params=None):
+        """
+        Fetch elements from the server, using `limit` and `offset`. If
+        `params` is set, only the elements matching them are fetched
+        """
+        if params is None:
+            func = getattr(self._api, "get_{}s".format(self._mode))
+            data = await func(self._slug, limit=limit, offset=offset)
+            if data.get("count") is not None:
+                self._total = data["count"]
+        else:
+            func = getattr(self._api, "filter_{}s".format(self._mode))
+            data = await func(self._slug, limit=limit, offset=offset,
+                              params=params)
+        return [self._dehydrate(element)
+                for element in data.get("{}s".format(self._mode), [])]
+
+    async def count(self):
+        """
+        Return the number of elements. If the data is not pulled, the
+        count reported by the server is used and cached
+        """
+        if self._data is not None:
+            return len(self._data) + len(self._to_add)
+        if self._total is None:
+            await self._fetch(limit=1, offset=0)
+        if self._total is None:
+            # No count reported by the server, so the pages are counted
+            async for _ in self.iter():
+                pass
+        return self._total + len(self._to_add)
+
+    async def iter(self, page_size=None):
+        """
+        Return an asynchronous generator over the elements. If the data is
+        not pulled, it is fetched from the server page by page
+        """
+        if self._data is not None:
+            for element in self._data:
+                yield element
+        else:
+            async for element in self._paged(page_size):
+                yield element
+        for element in self._to_add:
+            yield element
+
+    def __aiter__(self):
+        return self.iter()
+
+    def filter(self, params=None, page_size=None, **properties):
+        """
+        Return an asynchronous generator over the elements whose properties
+        match the values in `params` and `properties`, filtered by the
+        server and fetched page by page
+        """
+        params = dict(params or {}, **properties)
+        return self._paged(page_size, params)
+
+    async def _paged(self, page_size=None, params=None):
+        """
+        Return an asynchronous generator over the elements fetched page by
+        page, only the ones matching `params` if set
+        """
+        pager = _Pager(page_size or self._page_size)
+        while not pager.done:
+            elements = await self._fetch(limit=pager.page_size,
+                                         offset=pager.offset, params=params)
+            for element in pager.feed(
+                    elements, self._total if params is None else None):
+                yield element
+        if params is None and pager.total is not None:
+            self._total = pager.total
+
+    async def push(self, chunk_size=CHUNK_SIZE, workers=WORKERS,
+                   callback=None):
+        """
+        Push new data to the server for the datatype `datatype_slug`, in
+        chunks of `chunk_size` elements, with up to `workers` requests
+        running concurrently. Then, only the changed properties of loaded
+        elements are sent. Return a dictionary with the stats of the push
+        """
+        chunks = self._chunks(chunk_size)
+        total = len(self._to_add)
+        func = getattr(self._api, "post_{}s".format(self._mode))
+        semaphore = asyncio.Semaphore(workers)
+        errors = {}
+        pushed = [0]
+
+        async def push_chunk(index, chunk):
+            async with semaphore:
+                try:
+                    ids = await func(self._slug, params=self._params(chunk))
+                except Exception as e:
+                    errors[index] = e
+                    return
+            self._posted(chunk, ids)
+            pushed[0] += len(chunk)
+            if callback is not None:
+                callback(pushed[0], total)
+
+        # Changed elements are patched sending only their changes
+        patch = getattr(self._api, "patch_{}".format(self._mode))
+        update_errors = {}
+        updated = [0]
+
+        async def push_changes(element, changes):
+            async with semaphore:
+                try:
+                    await patch(self._slug, element["id"],
+                                params={"properties": changes})
+                except Exception as e:
+                    update_errors[element["id"]] = e
+                    return
+            self._updated(element, changes)
+            updated[0] += 1
+
+        start = time.time()
+        await asyncio.gather(*[push_chunk(index, chunk)
+                               for index, chunk in enumerate(chunks)])
+        await asyncio.gather(*[push_changes(element, changes)
+                               for element, changes in self._changed()])
+        return self._pushed(chunks, errors, time.time() - start, updated[0],
+                            update_errors)
+
+    async def update_many(self, updates, replace=False, workers=WORKERS):
+        """
+        Update the properties of many elements in the server, with up to
+        `workers` requests running concurrently. `updates` is a dictionary
+        of properties by element ID. Only the given properties are changed,
+        unless `replace` is `True`. Return a dictionary with the stats of the
+        update, including the exceptions raised by element ID in 'errors'
+        """
+        updates = dict(updates)
+        method = "put" if replace else "patch"
+        func = getattr(self._api, "{}_{}".format(method, self._mode))
+        start = time.time()
+        results, errors = await _gather(func, dict(
+            (_id, (self._slug, _id, {"properties": properties}))
+            for _id, properties in updates.items()
+        ), workers)
+        return self._updated_many(updates, replace, results, errors,
+                                  time.time() - start)
+
+    async def delete_many(self, ids, workers=WORKERS):
+        """
+        Delete many elements from the server by ID, with up to `workers`
+        requests running concurrently. Return a dictionary with the stats of
+        the deletion, including the exceptions raised by element ID in
+        'errors'
+        """
+        func = getattr(self._api, "delete_{}".format(self._mode))
+        start = time.time()
+        results, errors = await _gather(func, dict(
+            (_id, (self._slug, _id)) for _id in ids
+        ), workers)
+        return self._deleted_many(results, errors, time.time() - start)
+
+    async def pull(self):
+        """Pull data from the server"""
+        func = getattr(self._api, "get_{}s".format(self._mode))
+        data = await func(self._slug)
+        elements = data.get("{}s".format(self._mode), [])
+        self._data = [self._dehydrate(element) for element in elements]
+        self._total = len(self._data)
+        self._pages = {}
+        self._to_add = []
+        self._edited.clear()
+        self._reindex()
+
+    @property
+    def properties(self):
+        """Lazy loading the properties of a data type"""
+        if self._properties is None:
+            self._properties = AsyncPropertyCollection(self._api, self._mode,
+                                                       self._slug)
+        return self._properties
+
+
+class AsyncTypeCollection(AsyncCollectionMixin, TypeCollection):
+    """TypeCollection class for asyncio"""
+    __getitem__ = TypeCollection.__getitem__  # Look up by slug or name
+
+    async def push(self):
+        """Push new data to the server for the datatype `datatype_slug`"""
+        if self._to_add:
+            func = getattr(self._api, "post_{}types".format(self._mode))
+            await func(params=self._to_add)
+            self._to_add = []
+            # Slugs are set by the server, so types must be pulled again
+            self._data = None
+            self._indexes = None
+
+    async def pull(self):
+        """Pull data from the server"""
+        func = getattr(self._api, "get_{}types".format(self._mode))
+        self._data = await func()
+        self._indexes = None
+        self._to_add = []
+
+
+class AsyncPropertyCollection(AsyncCollectionMixin, PropertyCollection):
+    """PropertyCollection class for asyncio"""
+
+    async def pull(self):
+        """Pull type properties from the server"""
+        func = getattr(self._api,
+                       "get_{}type_schema_properties".format(self._mode))
+        self._data = await func(self._slug)
+        if self._data:
+            self._data = self._data["properties"]
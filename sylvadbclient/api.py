@@ -1,13 +1,204 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import, unicode_literals
+import hashlib
 import os
-
-import slumber
+import time
+from bisect import bisect_left, bisect_right
+from concurrent.futures import (
+    FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait,
+)
+from contextlib import contextmanager
+from functools import wraps
+from itertools import chain, count
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping  # NOQA
+
+from slumber import exceptions
+
+from .cache import get_cache, origin
+from .columnar import ColumnarStore, to_arrow, to_numpy, to_pandas
+from .metrics import Metrics
+from .serializers import SlumberAPI, get_serializer, materialize
+from .session import (
+    Compression, NotModified, RateLimiter, RetryPolicy, Session,
+)
+from .streams import STREAM_CHUNK_SIZE, open_stream, read_chunks
 
 HOST = "http://api.sylvadb.com/v1/"
 SYLVADB_API = os.environ.get("SYLVADB_API", HOST)
 NODE = "node"
 RELATIONSHIP = "relationship"
+PAGE_SIZE = 100
+CHUNK_SIZE = 1000
+WORKERS = 4
+# Properties of relationships that refer to their nodes
+REFERENCES = ("source_id", "target_id")
+
+
+def _paging(limit=None, offset=None):
+    """Build the query params to page through a listing"""
+    params = {}
+    if limit is not None:
+        params["limit"] = limit
+    if offset is not None:
+        params["offset"] = offset
+    return params
+
+
+class _Pager(object):
+    """
+    Offsets of the pages of `page_size` elements to fetch from a listing.
+    It is done on the last page, or if the server ignored the offset and
+    repeated a page
+    """
+
+    def __init__(self, page_size):
+        self.page_size = page_size
+        self.offset = 0
+        self.total = None  # Number of elements listed, once known
+        self.done = False
+        self._first = None  # ID of the first element of the last page
+
+    def feed(self, elements, total=None):
+        """
+        Take the `elements` fetched at the current offset, out of `total`
+        if known, and move to the next page. Return the elements to yield
+        """
+        if self.offset and elements and elements[0]["id"] == self._first:
+            # The server ignored the offset and repeated the page
+            self.total, self.done = self.offset, True
+            return []
+        self._first = elements[0]["id"] if elements else None
+        if len(elements) != self.page_size:
+            # Last page, or the server ignored the paging
+            self.total, self.done = self.offset + len(elements), True
+        else:
+            self.offset += self.page_size
+            self.done = total is not None and self.offset >= total
+        return elements
+
+
+def _concurrently(func, calls, workers):
+    """
+    Call `func` with the arguments in `calls`, a dictionary of positional
+    arguments by key, using up to `workers` threads. Return the results and
+    the exceptions raised, both by key
+    """
+    results = {}
+    errors = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = dict((executor.submit(func, *args), key)
+                       for key, args in calls.items())
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                errors[key] = e
+    return results, errors
+
+
+def _upload(collections, chunk_size=CHUNK_SIZE, workers=WORKERS,
+            callback=None):
+    """
+    Post the new elements of `collections` in chunks of `chunk_size`
+    elements, sent concurrently by `workers` threads shared among them.
+    Chunks of relationships referring to new nodes are sent as soon as
+    those nodes get their IDs, while the rest of nodes are still being
+    sent. If set, `callback` is called with the number of elements posted
+    so far and the total after every chunk. Return the chunks and the
+    exceptions raised by chunk index, both by collection
+    """
+    chunks = dict((collection, collection._chunks(chunk_size))
+                  for collection in collections)
+    errors = dict((collection, {}) for collection in collections)
+    total = sum(len(collection._to_add) for collection in collections)
+    pending = [(collection, index) for collection in collections
+               for index in range(len(chunks[collection]))]
+    futures = {}
+    pushed = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while pending or futures:
+            waiting = []
+            for collection, index in pending:
+                if collection._ready(chunks[collection][index]):
+                    future = executor.submit(collection._post,
+                                             chunks[collection][index])
+                    futures[future] = (collection, index)
+                else:
+                    waiting.append((collection, index))
+            pending = waiting
+            if not futures:
+                # The rest refer to nodes that will not get their IDs
+                break
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                collection, index = futures.pop(future)
+                try:
+                    ids = future.result()
+                except Exception as e:
+                    errors[collection][index] = e
+                    continue
+                collection._posted(chunks[collection][index], ids)
+                pushed += len(chunks[collection][index])
+                if callback is not None:
+                    callback(pushed, total)
+    for collection, index in pending:
+        errors[collection][index] = ValueError(
+            "Relationships refer to nodes not pushed")
+    return chunks, errors
+
+
+def _node_id(reference):
+    """
+    Return the ID of a node referred by element or by ID, or `None` if it
+    has not been pushed yet
+    """
+    if isinstance(reference, Mapping):
+        reference = reference["id"]
+    if isinstance(reference, TemporaryId):
+        return reference.id
+    return reference
+
+
+def endpoint(func):
+    """Decorator naming after `func` the endpoint of its requests"""
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        with self._session.endpoint(func.__name__):
+            return func(self, *args, **kwargs)
+    return wrapper
+
+
+def cached(func):
+    """Decorator for API methods whose responses can be cached"""
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        return self._cached_call(func, args, kwargs)
+    return wrapper
+
+
+def invalidates(func):
+    """Decorator for API methods that change data, invalidating the cache"""
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        return self._invalidating_call(func, args, kwargs)
+    return wrapper
+
+
+class PushError(Exception):
+    """
+    Raised when some chunks of a push fail. The elements of those chunks are
+    kept in the collection, so a new push resumes from them
+    """
+
+    def __init__(self, message, errors, stats, update_errors=None):
+        super(PushError, self).__init__(message)
+        self.errors = errors  # Exceptions by chunk index
+        self.update_errors = update_errors or {}  # Exceptions by element ID
+        self.stats = stats
 
 
 # Extracted from Six for Python 2 and 3 compatibility
@@ -35,13 +226,155 @@ class BaseMeta(type):
         for attr in cls._attrs.keys():
             setattr(cls, attr, property(
                 # Getter
-                lambda self: self._attrs.get(attr, None),
+                lambda self, attr=attr: self._attrs.get(attr, None),
                 # Setter
-                lambda self, value: self._attrs.__setitem__(attr, value),
+                lambda self, value, attr=attr: self._set_attr(attr, value),
             ))
         return cls
 
 
+class Properties(dict):
+    """Dictionary of properties that keeps track of the changed keys"""
+    __slots__ = ("changed", "_edited", "_element_id")
+
+    def __init__(self, *args, **kwargs):
+        super(Properties, self).__init__(*args, **kwargs)
+        self.changed = set()
+        self._edited = None
+
+    def track(self, edited, element_id):
+        """
+        Keep the properties in the dictionary `edited` by `element_id` once
+        changed, so the changes are found even if the element is not held
+        """
+        self._edited = edited
+        self._element_id = element_id
+
+    def _change(self, keys):
+        self.changed.update(keys)
+        if self._edited is not None:
+            self._edited[self._element_id] = self
+
+    def __setitem__(self, key, value):
+        self._change((key, ))
+        super(Properties, self).__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._change((key, ))
+        super(Properties, self).__delitem__(key)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key, *args):
+        if key in self:
+            self._change((key, ))
+        return super(Properties, self).pop(key, *args)
+
+    def popitem(self):
+        key, value = super(Properties, self).popitem()
+        self._change((key, ))
+        return key, value
+
+    def clear(self):
+        self._change(list(self))
+        super(Properties, self).clear()
+
+    def changes(self):
+        """Return the changed properties, with `None` for removed ones"""
+        return dict((key, self.get(key)) for key in self.changed)
+
+
+class TemporaryId(object):
+    """
+    Placeholder ID of a new element until it is pushed. New relationships
+    can use it as 'source_id' or 'target_id' to refer to a new node, and it
+    is rewritten to the ID set by the server once the node is pushed
+    """
+    _numbers = count(1)
+
+    def __init__(self):
+        self.number = next(self._numbers)
+        self.id = None  # Set once pushed
+
+    def __repr__(self):
+        return "<SylvaDB TemporaryId {} at {}>".format(self.number,
+                                                       hex(id(self)))
+
+
+class Index(object):
+    """
+    In-memory index of elements by the value of the property `key`. If
+    `ordered`, ranges of values can be looked up too
+    """
+
+    def __init__(self, key, ordered=False):
+        self.key = key
+        self.ordered = ordered
+        self._elements = {}  # Elements by value
+        self._values = None  # Sorted keys and values, built when needed
+        self.built = False  # Set once all the elements are added
+
+    def __repr__(self):
+        return "<SylvaDB Index of {} at {}>".format(self.key, hex(id(self)))
+
+    @staticmethod
+    def _order(value):
+        """Sort key to compare values of different types"""
+        return (type(value).__name__, value)
+
+    def add(self, element):
+        """Index `element` by the value of its property"""
+        properties = element["properties"]
+        if self.key in properties:
+            try:
+                elements = self._elements.setdefault(properties[self.key], [])
+            except TypeError:
+                return  # Unhashable values are not indexed
+            elements.append(element)
+            self._values = None
+
+    def discard(self, element, value):
+        """Stop indexing `element` by `value`, if it is"""
+        try:
+            elements = [indexed for indexed in self._elements.get(value, [])
+                        if indexed is not element]
+        except TypeError:
+            return
+        if elements:
+            self._elements[value] = elements
+        else:
+            self._elements.pop(value, None)
+        self._values = None
+
+    def lookup(self, value):
+        """Return the elements with `value` in the property"""
+        try:
+            return list(self._elements.get(value, []))
+        except TypeError:
+            return []
+
+    def range(self, start=None, end=None):
+        """Return the elements with values from `start` to `end`, included"""
+        if not self.ordered:
+            raise TypeError("Index of {} is not ordered".format(self.key))
+        if self._values is None:
+            values = sorted(self._elements, key=self._order)
+            self._values = ([self._order(value) for value in values], values)
+        keys, values = self._values
+        low = 0 if start is None else bisect_left(keys, self._order(start))
+        high = (len(keys) if end is None
+                else bisect_right(keys, self._order(end)))
+        return [element for value in values[low:high]
+                for element in self._elements[value]]
+
+
 class Base(object):
 
     def get(self, key, *args, **kwargs):
@@ -92,22 +425,144 @@ class Graph(object):
         "public": False,
     }  # For the metaclass
 
-    def __init__(self, graph_slug, auth):
-        self._api = API(token=auth, graph_slug=graph_slug)
-        self.nodes = Data(api=self._api, mode=NODE)
-        self.relationships = Data(api=self._api, mode=RELATIONSHIP)
+    def __init__(self, graph_slug, auth, session=None, columnar=False,
+                 retry=True, rate_limit=None):
+        self._api = API(token=auth, graph_slug=graph_slug, session=session,
+                        retry=retry, rate_limit=rate_limit)
+        self._attrs = dict(self._attrs)
+        self._changed = set()  # Tracks properties changed since the pull
+        self._validators = {}  # Conditional headers of the pulls
+        self.nodes = Data(api=self._api, mode=NODE, columnar=columnar)
+        self.relationships = Data(api=self._api, mode=RELATIONSHIP,
+                                  columnar=columnar)
         self.rels = self.relationships
         self.pull()
 
+    def _set_attr(self, attr, value):
+        """Set the Graph property `attr`, keeping track of the change"""
+        self._attrs[attr] = value
+        self._changed.add(attr)
+
     def push(self):
         """Push changes from the Graph properties to the server"""
-        self._api.patch_graph(params=self._attrs)
+        if self._changed:
+            params = dict((attr, self._attrs[attr]) for attr in self._changed)
+            self._api.patch_graph(params=params)
+            self._changed = set()
+
+    def push_all(self, chunk_size=CHUNK_SIZE, workers=WORKERS,
+                 callback=None):
+        """
+        Push every change to the graph in dependency order: its properties,
+        node types, relationship types, the properties of the types, nodes
+        and relationships. Nodes and relationships are sent in chunks of
+        `chunk_size` elements by `workers` threads shared by all the types,
+        and relationships referring to new nodes are sent as soon as those
+        nodes are pushed. If set, `callback` is called as in
+        `DataCollection.push`. Return a dictionary with the stats of the push
+        """
+        start = time.time()
+        self.push()
+        stats = {"types": 0, "properties": 0}
+        for data in (self.nodes, self.relationships):
+            if data._types is not None:
+                stats["types"] += len(data.types._to_add)
+                if data is self.relationships:
+                    self._link_types(data.types._to_add)
+                data.types.push()
+            data._resolve()
+        collections = [collection
+                       for data in (self.nodes, self.relationships)
+                       for collection in data._datacols.values()]
+        properties = dict((index, (collection.properties, ))
+                          for index, collection in enumerate(collections)
+                          if collection._properties is not None
+                          and collection._properties._to_add)
+        stats["properties"] = sum(len(args[0]._to_add)
+                                  for args in properties.values())
+        # Types are independent, so their properties are sent concurrently
+        results, errors = _concurrently(PropertyCollection.push, properties,
+                                        workers)
+        if errors:
+            raise PushError("{} of {} types failed to push properties".format(
+                len(errors), len(properties)), errors, stats)
+        # Nodes and relationships are sent at once, so they overlap
+        chunks, chunk_errors = _upload(
+            [collection for collection in collections if collection._to_add],
+            chunk_size, workers, callback)
+        errors = {}
+        for data in (self.nodes, self.relationships):
+            mode = "{}s".format(data._mode)
+            stats[mode] = {}
+            for collection in data._datacols.values():
+                try:
+                    stats[mode][collection._slug] = collection._update(
+                        chunks.get(collection, []),
+                        chunk_errors.get(collection, {}), start, workers)
+                except PushError as e:
+                    stats[mode][collection._slug] = e.stats
+                    errors[(mode, collection._slug)] = e
+        stats["seconds"] = time.time() - start
+        if errors:
+            raise PushError("{} of the types failed to push".format(
+                len(errors)), errors, stats)
+        return stats
+
+    def _link_types(self, types):
+        """
+        Set the slugs of the node types that the new relationship `types`
+        refer to by name as 'source' or 'target', once they are pushed
+        """
+        for _type in types:
+            for key in ("source", "target"):
+                if (_type.get(key) is not None
+                        and _type[key] in self.nodes.types):
+                    _type[key] = self.nodes.types[_type[key]]["slug"]
+
+    @contextmanager
+    def batch(self, chunk_size=CHUNK_SIZE, workers=WORKERS, callback=None):
+        """
+        Context to make many changes to the graph, pushed all at once on
+        exit with `push_all`, unless an exception is raised. New types can
+        be used by name before being pushed, also as the source and target
+        of new relationship types. It gives a dictionary that is
+        filled with the stats of the push
+        """
+        stats = {}
+        yield stats
+        stats.update(self.push_all(chunk_size, workers, callback))
 
     def pull(self):
         """Pull changes to the Graph properties from the server"""
-        _attrs = self._api.get_graph()
+        try:
+            with self._api.conditional(hasattr(self, "_pulled_attrs"),
+                                       self._validators):
+                _attrs = self._api.get_graph()
+        except NotModified:
+            _attrs = self._pulled_attrs
         for prop in self._attrs:
             self._attrs[prop] = _attrs[prop]
+        self._pulled_attrs = dict(self._attrs)
+        self._changed = set()
+
+    def import_from(self, path_or_fileobj, data=True, schema=True,
+                    compression=None, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        Import Graph data, schema or both from an export in a path or
+        binary file object, uploading it in chunks of `chunk_size` bytes.
+        The compression, 'gzip' or 'zstd', is inferred from the extension of
+        the path if not set
+        """
+        with open_stream(path_or_fileobj, "rb", compression) as stream:
+            chunks = read_chunks(stream, chunk_size)
+            if data and not schema:
+                response = self._api.import_data(chunks)
+            elif not data and schema:
+                response = self._api.import_schema(chunks)
+            else:
+                response = self._api.import_graph(chunks)
+        self.pull()
+        return response
 
     def destroy(self):
         """Delete all contents and remove the Graph"""
@@ -122,13 +577,35 @@ class Graph(object):
         else:
             return self._api.export_graph()
 
+    def export_to(self, path_or_fileobj, data=True, schema=True,
+                  compression=None, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        Export Graph data, schema or both to a path or binary file object,
+        streaming the response in chunks of `chunk_size` bytes. It can be
+        compressed with 'gzip' or 'zstd', inferred from the extension of
+        the path if not set. Return the number of bytes exported
+        """
+        if data and not schema:
+            chunks = self._api.export_data_stream(chunk_size)
+        elif not data and schema:
+            chunks = self._api.export_schema_stream(chunk_size)
+        else:
+            chunks = self._api.export_graph_stream(chunk_size)
+        exported = 0
+        with open_stream(path_or_fileobj, "wb", compression) as stream:
+            for chunk in chunks:
+                stream.write(chunk)
+                exported += len(chunk)
+        return exported
+
 
 class Data(Base):
     """Data class to handle nodes and relationships"""
 
-    def __init__(self, api, mode):
+    def __init__(self, api, mode, columnar=False):
         self._api = api
         self._mode = mode
+        self._columnar = columnar
         self._types = None
         self._datacols = {}
 
@@ -145,19 +622,36 @@ class Data(Base):
         or relationship type. If not found, a `KeyError` is returned
         """
         _key = self.__keytransform__(datatype)
-        if _key in self.types or _key in [t["slug"] for t in self.types]:
-            if _key not in self._datacols:
-                # Required step to keep track of new data to add in collections
-                data_collections = DataCollection(self._api, self._mode, _key)
-                self._datacols[_key] = data_collections
-            return self._datacols[_key]
-        else:
-            raise KeyError("{}type '{}' not found".format(self._mode, _key))
+        # Types can be referred by slug or by name, and new ones by name
+        # until they are pushed
+        if self.types._new(_key) is None or _key in self.types:
+            _key = self.types[_key]["slug"]
+        elif _key not in self._datacols:
+            data_collections = DataCollection(self._api, self._mode,
+                                              columnar=self._columnar)
+            # There is nothing in the server yet
+            data_collections._data = []
+            data_collections.properties._data = []
+            self._datacols[_key] = data_collections
+        if _key not in self._datacols:
+            # Required step to keep track of new data to add in collections
+            data_collections = DataCollection(self._api, self._mode, _key,
+                                              columnar=self._columnar)
+            self._datacols[_key] = data_collections
+        return self._datacols[_key]
 
     def __iter__(self):
         """Return an interator over the types"""
         return iter(self.types)
 
+    def _resolve(self):
+        """Set the slugs of the collections of types already pushed"""
+        for key, collection in list(self._datacols.items()):
+            if collection._slug is None and key in self.types:
+                collection._slug = self.types[key]["slug"]
+                collection.properties._slug = collection._slug
+                self._datacols[collection._slug] = self._datacols.pop(key)
+
     def __len__(self):
         """Return the number of types"""
         return len(self.types)
@@ -172,12 +666,16 @@ class BaseCollection(Base):
         self._slug = slug
         self._data = None
         self._to_add = []  # Tracks new data to add in push
+        self._validators = {}  # Conditional headers of the pulls
 
     @property
     def data(self):
         """Lazy loading the data (list of nodes and relationships)"""
         if self._data is None:
+            # New data added before loading is kept
+            to_add = self._to_add
             self.pull()
+            self._to_add = to_add
         return self._data
 
     def _hydrate(self, data_dict):
@@ -189,8 +687,12 @@ class BaseCollection(Base):
         return data_dict
 
     def add(self, data_dict):
-        """Add a new data dictionary to be added on a push"""
+        """
+        Add a new data dictionary to be added on a push. Return the element
+        added
+        """
         self._to_add.append(self._hydrate(data_dict))
+        return self._to_add[-1]
 
     def all(self):
         """Return all the elements in the collection"""
@@ -198,54 +700,629 @@ class BaseCollection(Base):
 
     def single(self):
         """Return the first item dictionary in the collection"""
-        data = self.data + self._to_add
-        if data:
-            return data[0]
+        return next(iter(self), None)
+
+    def count(self):
+        """Return the number of elements in the collection"""
+        return len(self)
 
     def __getitem__(self, key):
-        # TODO: Lazy loading and slicing from server
+        # Types and properties are still sliced locally, elements are paged
         _key = self.__keytransform__(key)
         if isinstance(_key, (int, slice)):
             return self.all()[_key]
 
     def __iter__(self):
         """Return an interator over the data"""
-        return iter(self.all())
+        return chain(self.data, self._to_add)
 
     def __len__(self):
         """Return the number of elements in the data"""
-        return len(self.all())
+        return len(self.data) + len(self._to_add)
 
 
 class DataCollection(BaseCollection):
     """DataCollection class to handle collection of nodes or relationships"""
 
-    def __init__(self, api, mode, slug=None):
+    def __init__(self, api, mode, slug=None, page_size=PAGE_SIZE,
+                 columnar=False):
         super(DataCollection, self).__init__(api, mode, slug)
+        self._columnar = columnar  # Store the pulled data by columns
         self._properties = None
+        self._page_size = page_size
+        self._pages = {}  # Page cache used when the data is not pulled
+        self._total = None  # Number of elements in the server
+        self._ids = None  # Elements by ID, built when needed
+        self._indexes = {}  # Indexes by property key, declared by the user
+        self._edited = {}  # Changed properties of fetched elements by ID
 
     def _hydrate(self, data_dict):
         """Transform data to be sent to the server. Override to customize"""
-        return {"id": None, "properties": data_dict}
+        return {"id": TemporaryId(), "properties": Properties(data_dict)}
 
-    def push(self):
-        """Push new data to the server for the datatype `datatype_slug`"""
-        if self._to_add:
-            func = getattr(self._api, "post_{}s".format(self._mode))
-            ids = func(self._slug, params=self._to_add)
-            if ids:
-                # Update IDs as returned by the server
-                for i, _id in enumerate(ids):
-                    self._to_add[i].update({"id": _id})
-                self._data += self._to_add
-            self._to_add = []
+    def _dehydrate(self, data_dict):
+        """Transform data from server. Override to customize"""
+        # Copied, since lazily decoded responses are read-only
+        data_dict = dict(data_dict)
+        properties = Properties(data_dict.get("properties", {}))
+        # Streamed elements are not held, so their changes are kept apart
+        properties.track(self._edited, data_dict.get("id"))
+        data_dict["properties"] = properties
+        return data_dict
+
+    def add(self, data_dict):
+        """
+        Add a new data dictionary to be added on a push. Return the element
+        added. New relationships can refer to a new node by its element or
+        by its temporary ID as 'source_id' or 'target_id'
+        """
+        element = super(DataCollection, self).add(data_dict)
+        for index in self._indexes.values():
+            if index.built:
+                index.add(element)
+        return element
+
+    def _reindex(self):
+        """Drop the indexes, so they are built again when needed"""
+        self._ids = None
+        for key, index in self._indexes.items():
+            self._indexes[key] = Index(key, index.ordered)
+
+    def create_index(self, key, ordered=False):
+        """
+        Declare an in-memory index of the elements by the value of the
+        property `key`, built when first used. If `ordered`, ranges of
+        values can be looked up too
+        """
+        self._indexes[key] = Index(key, ordered)
+
+    def drop_index(self, key):
+        """Remove the index of the property `key`"""
+        self._indexes.pop(key, None)
+
+    def _index(self, key):
+        """Return the index of the property `key`, building it if needed"""
+        if key not in self._indexes:
+            raise KeyError("There is no index for '{}'".format(key))
+        index = self._indexes[key]
+        if not index.built:
+            for element in chain(self.data, self._to_add):
+                index.add(element)
+            index.built = True
+        return index
+
+    def get_by_id(self, _id, default=None):
+        """Return the element with ID `_id`, pulling the data if needed"""
+        if self._ids is None:
+            self._ids = dict((element["id"], element)
+                             for element in self.data)
+        return self._ids.get(_id, default)
+
+    def lookup(self, key, value):
+        """
+        Return the elements, pending ones too, with `value` in the property
+        `key`, using its index
+        """
+        return self._index(key).lookup(value)
+
+    def lookup_range(self, key, start=None, end=None):
+        """
+        Return the elements with values from `start` to `end`, both
+        included, in the property `key`, using its ordered index
+        """
+        return self._index(key).range(start, end)
+
+    def _fetch(self, limit=None, offset=None, params=None):
+        """
+        Fetch elements from the server, using `limit` and `offset`. If
+        `params` is set, only the elements matching them are fetched
+        """
+        if params is None:
+            func = getattr(self._api, "get_{}s".format(self._mode))
+            data = func(self._slug, limit=limit, offset=offset)
+            if data.get("count") is not None:
+                self._total = data["count"]
+        else:
+            func = getattr(self._api, "filter_{}s".format(self._mode))
+            data = func(self._slug, limit=limit, offset=offset,
+                        params=params)
+        return [self._dehydrate(element)
+                for element in data.get("{}s".format(self._mode), [])]
+
+    def _page(self, index):
+        """Return the page number `index`, fetching it only if not cached"""
+        if index not in self._pages:
+            offset = index * self._page_size
+            elements = self._fetch(limit=self._page_size, offset=offset)
+            if len(elements) > self._page_size:
+                # The server ignored the paging and returned all the data
+                self._data = elements
+                self._total = len(elements)
+                self._pages = {}
+                return elements[offset:offset + self._page_size]
+            if len(elements) < self._page_size and (elements or not index):
+                self._total = offset + len(elements)
+            self._pages[index] = elements
+        return self._pages[index]
+
+    def _server_len(self):
+        """Return the number of elements stored in the server"""
+        if self._data is not None:
+            return len(self._data)
+        if self._total is None:
+            self._page(0)
+        if self._total is None:
+            # No count reported by the server, so the pages are counted
+            for _ in self.iter():
+                pass
+        return self._total
+
+    def _get_index(self, index):
+        """Return the element at position `index`, fetching its page"""
+        if index < 0:
+            index += len(self)
+            if index < 0:
+                raise IndexError("{} index out of range".format(self._mode))
+        if self._data is None:
+            page_index, position = divmod(index, self._page_size)
+            page = self._page(page_index)
+            if self._data is None and position < len(page):
+                return page[position]
+        if self._data is not None and index < len(self._data):
+            return self._data[index]
+        index -= self._server_len()
+        if 0 <= index < len(self._to_add):
+            return self._to_add[index]
+        raise IndexError("{} index out of range".format(self._mode))
+
+    def _get_slice(self, key):
+        """Return the elements in the slice `key`, fetching only its pages"""
+        start, stop, step = key.start or 0, key.stop, key.step or 1
+        if step > 0 and start >= 0 and stop is not None and stop >= 0:
+            # Positions known beforehand, no need to compute the length
+            indices = range(start, stop, step)
+        else:
+            indices = range(*key.indices(len(self)))
+        elements = []
+        for index in indices:
+            try:
+                elements.append(self._get_index(index))
+            except IndexError:
+                break
+        return elements
+
+    def __getitem__(self, key):
+        """
+        Return the element or elements of a position or slice, fetching
+        from the server only the pages needed
+        """
+        _key = self.__keytransform__(key)
+        if isinstance(_key, slice):
+            return self._get_slice(_key)
+        elif isinstance(_key, int):
+            return self._get_index(_key)
+
+    def __iter__(self):
+        """Return an interator over the data, streamed if not pulled yet"""
+        return self.iter()
+
+    def __len__(self):
+        """Return the number of elements in the data"""
+        return self._server_len() + len(self._to_add)
+
+    def count(self):
+        """
+        Return the number of elements. If the data is not pulled, the
+        count reported by the server is used and cached
+        """
+        if self._data is None and self._total is None:
+            self._fetch(limit=1, offset=0)
+        return len(self)
+
+    def iter(self, page_size=None):
+        """
+        Return a generator over the elements. If the data is not pulled, it
+        is fetched from the server page by page, holding a page at a time
+        """
+        for element in self._stream(page_size):
+            yield element
+        for element in self._to_add:
+            yield element
+
+    def _stream(self, page_size=None):
+        """Return a generator over the elements stored in the server"""
+        if self._data is not None:
+            for element in self._data:
+                yield element
+        else:
+            for element in self._paged(page_size):
+                yield element
+
+    def _paged(self, page_size=None, params=None):
+        """
+        Return a generator over the elements fetched page by page, only
+        the ones matching `params` if set
+        """
+        pager = _Pager(page_size or self._page_size)
+        while not pager.done:
+            elements = self._fetch(limit=pager.page_size,
+                                   offset=pager.offset, params=params)
+            for element in pager.feed(
+                    elements, self._total if params is None else None):
+                yield element
+        if params is None and pager.total is not None:
+            self._total = pager.total
+
+    def _columns(self, page_size=None):
+        """
+        Return the elements stored in the server in a `ColumnarStore` and
+        whether it is the pulled data. If not pulled, the pages are streamed
+        into the columns
+        """
+        if isinstance(self._data, ColumnarStore):
+            return self._data, True
+        store = ColumnarStore(self._schema())
+        store.extend(self._stream(page_size))
+        return store, False
+
+    def to_numpy(self, page_size=None):
+        """
+        Return a dictionary of NumPy arrays by property key, and the IDs in
+        'id', with the dtypes of the type properties. Pending elements are
+        not included
+        """
+        store, pulled = self._columns(page_size)
+        return to_numpy(store, copy=pulled)
+
+    def to_pandas(self, page_size=None):
+        """
+        Return a `pandas.DataFrame` indexed by ID with a column per property
+        key, with the dtypes of the type properties
+        """
+        store, pulled = self._columns(page_size)
+        return to_pandas(store, copy=pulled)
+
+    def to_arrow(self, page_size=None):
+        """
+        Return a `pyarrow.Table` with the IDs in 'id' and a column per
+        property key, with the types of the type properties
+        """
+        store, pulled = self._columns(page_size)
+        return to_arrow(store, copy=pulled)
+
+    def filter(self, params=None, page_size=None, **properties):
+        """
+        Return a generator over the elements whose properties match the
+        values in `params` and `properties`. The elements are filtered by
+        the server and fetched page by page
+        """
+        params = dict(params or {}, **properties)
+        return self._paged(page_size, params)
+
+    def _chunks(self, chunk_size):
+        """Split the new data in chunks of `chunk_size` elements"""
+        return [self._to_add[i:i + chunk_size]
+                for i in range(0, len(self._to_add), chunk_size)]
+
+    def _changed(self):
+        """
+        Return the loaded elements with changed properties, and the
+        changes of each one of them
+        """
+        if isinstance(self._data, ColumnarStore):
+            changed = self._data.changed_elements()
+        else:
+            if self._data is not None:
+                elements = self._data
+            else:
+                elements = chain.from_iterable(self._pages.values())
+            changed = [(element, element["properties"].changes())
+                       for element in elements
+                       if element["id"] is not None
+                       and getattr(element["properties"], "changed", None)]
+        # Elements streamed or filtered, if changed and not loaded
+        ids = set(element["id"] for element, _ in changed)
+        changed.extend(
+            ({"id": _id, "properties": properties}, properties.changes())
+            for _id, properties in list(self._edited.items())
+            if _id not in ids and properties.changed)
+        return changed
+
+    def _updated(self, element, changes):
+        """Keep track of the `changes` of `element` sent to the server"""
+        element["properties"].changed.difference_update(changes)
+        if not element["properties"].changed:
+            self._edited.pop(element["id"], None)
+
+    def _pushed(self, chunks, errors, seconds, updated=0,
+                update_errors=None):
+        """
+        Keep track of the pushed `chunks`, except the ones in `errors`.
+        Return the stats of the push or raise a `PushError`
+        """
+        added = [element for index, chunk in enumerate(chunks)
+                 if index not in errors for element in chunk]
+        for element in added:
+            if isinstance(element["properties"], Properties):
+                element["properties"].changed.clear()
+                element["properties"].track(self._edited, element["id"])
+        if isinstance(self._data, ColumnarStore):
+            # Elements are copied into the columns, so indexes are rebuilt
+            first = len(self._data)
+            self._data += added
+            self._reindex()
+            # and their properties turned into views, to keep their changes
+            for index, element in enumerate(added, first):
+                element["properties"] = self._data[index]["properties"]
+        elif self._data is not None:
+            self._data += added
+        elif self._total is not None:
+            self._total += len(added)
+        if added:
+            # The last cached page might be incomplete now
+            self._pages = {}
+        if self._ids is not None:
+            self._ids.update((element["id"], element) for element in added)
+        if updated:
+            # Changed values are indexed again
+            self._reindex()
+        # Elements of failed chunks are kept for the next push
+        self._to_add = [element for index in sorted(errors)
+                        for element in chunks[index]]
+        stats = {
+            "elements": len(added),
+            "chunks": len(chunks) - len(errors),
+            "failed": len(self._to_add),
+            "updated": updated,
+            "seconds": seconds,
+            "throughput": ((len(added) + updated) / seconds
+                           if seconds else None),
+        }
+        if errors or update_errors:
+            raise PushError("{} of {} chunks and {} updates failed".format(
+                len(errors), len(chunks), len(update_errors or {})),
+                errors, stats, update_errors)
+        return stats
+
+    def push(self, chunk_size=CHUNK_SIZE, workers=WORKERS, callback=None):
+        """
+        Push new data to the server for the datatype `datatype_slug`, in
+        chunks of `chunk_size` elements sent concurrently by `workers`
+        threads. If set, `callback` is called with the number of elements
+        pushed so far and the total after every chunk. Then, only the
+        changed properties of loaded elements are sent. Return a dictionary
+        with the stats of the push
+        """
+        start = time.time()
+        chunks, errors = _upload([self], chunk_size, workers, callback)
+        return self._update(chunks[self], errors[self], start, workers)
+
+    def _references(self, element):
+        """
+        Return the references of `element` to new nodes, by element or by
+        temporary ID, by property
+        """
+        if self._mode != RELATIONSHIP:
+            return {}
+        return dict((key, element["properties"][key]) for key in REFERENCES
+                    if isinstance(element["properties"].get(key),
+                                  (Mapping, TemporaryId)))
+
+    def _ready(self, chunk):
+        """Check if the new nodes the elements in `chunk` refer to have IDs"""
+        return all(_node_id(reference) is not None for element in chunk
+                   for reference in self._references(element).values())
+
+    def _params(self, chunk):
+        """Return the new elements in `chunk` as sent to the server"""
+        params = []
+        for element in chunk:
+            references = dict(
+                (key, _node_id(reference))
+                for key, reference in self._references(element).items())
+            if None in references.values():
+                raise ValueError("Relationships refer to nodes not pushed")
+            properties = element["properties"]
+            if references:
+                # New nodes are referred by their IDs once pushed
+                properties = dict(properties)
+                properties.update(references)
+            params.append({"id": None, "properties": properties})
+        return params
+
+    def _post(self, chunk):
+        """Send the new elements in `chunk`, returning their IDs"""
+        func = getattr(self._api, "post_{}s".format(self._mode))
+        return func(self._slug, params=self._params(chunk))
+
+    def _posted(self, chunk, ids):
+        """Keep track of the IDs of the elements in the `chunk` sent"""
+        # Update IDs as returned by the server, in chunk order
+        for element, _id in zip(chunk, ids or []):
+            if isinstance(element["id"], TemporaryId):
+                # References to the temporary ID are resolved too
+                element["id"].id = _id
+            element.update({"id": _id})
+            references = self._references(element)
+            for key, reference in references.items():
+                element["properties"][key] = _node_id(reference)
+            for index in self._indexes.values():
+                if index.built and index.key in references:
+                    index.discard(element, references[index.key])
+                    index.add(element)
+
+    def _update(self, chunks, errors, start, workers=WORKERS):
+        """
+        Patch the changed elements after posting `chunks`, with `errors`
+        by chunk index. Return the stats of the push started at `start`
+        """
+        # Changed elements are patched sending only their changes
+        changed = dict((element["id"], (element, changes))
+                       for element, changes in self._changed())
+        func = getattr(self._api, "patch_{}".format(self._mode))
+        results, update_errors = _concurrently(func, dict(
+            (_id, (self._slug, _id, {"properties": changes}))
+            for _id, (element, changes) in changed.items()
+        ), workers)
+        for _id in results:
+            self._updated(*changed[_id])
+        return self._pushed(chunks, errors, time.time() - start,
+                            len(results), update_errors)
+
+    def _loaded(self):
+        """Return the loaded elements by ID"""
+        if self._data is not None:
+            elements = self._data
+        else:
+            elements = chain.from_iterable(self._pages.values())
+        return dict((element["id"], element) for element in elements)
+
+    def update_many(self, updates, replace=False, workers=WORKERS):
+        """
+        Update the properties of many elements in the server, sending up to
+        `workers` requests concurrently. `updates` is a dictionary of
+        properties by element ID. Only the given properties are changed,
+        unless `replace` is `True`. Return a dictionary with the stats of the
+        update, including the exceptions raised by element ID in 'errors'
+        """
+        updates = dict(updates)
+        method = "put" if replace else "patch"
+        func = getattr(self._api, "{}_{}".format(method, self._mode))
+        start = time.time()
+        results, errors = _concurrently(func, dict(
+            (_id, (self._slug, _id, {"properties": properties}))
+            for _id, properties in updates.items()
+        ), workers)
+        return self._updated_many(updates, replace, results, errors,
+                                  time.time() - start)
+
+    def _updated_many(self, updates, replace, results, errors, seconds):
+        """
+        Keep track of the `updates` sent, with the `results` and `errors`
+        by element ID. Return the stats of the update
+        """
+        loaded = self._loaded()
+        for _id in results:
+            element = loaded.get(_id)
+            if element is None:
+                continue
+            if replace:
+                element["properties"] = Properties(updates[_id])
+                element["properties"].track(self._edited, _id)
+                self._edited.pop(_id, None)
+            else:
+                # The changes are already in the server, so not tracked
+                element["properties"].update(updates[_id])
+                element["properties"].changed.difference_update(
+                    updates[_id])
+                if not element["properties"].changed:
+                    self._edited.pop(_id, None)
+        if results:
+            self._reindex()
+        return {
+            "updated": len(results),
+            "failed": len(errors),
+            "errors": errors,
+            "seconds": seconds,
+            "throughput": len(results) / seconds if seconds else None,
+        }
+
+    def delete_many(self, ids, workers=WORKERS):
+        """
+        Delete many elements from the server by ID, sending up to `workers`
+        requests concurrently. Return a dictionary with the stats of the
+        deletion, including the exceptions raised by element ID in 'errors'
+        """
+        func = getattr(self._api, "delete_{}".format(self._mode))
+        start = time.time()
+        results, errors = _concurrently(func, dict(
+            (_id, (self._slug, _id)) for _id in ids
+        ), workers)
+        return self._deleted_many(results, errors, time.time() - start)
+
+    def _deleted_many(self, results, errors, seconds):
+        """
+        Keep track of the elements deleted, with the `results` and `errors`
+        by element ID. Return the stats of the deletion
+        """
+        if results:
+            if isinstance(self._data, ColumnarStore):
+                self._data = self._data.without(results)
+            elif self._data is not None:
+                self._data = [element for element in self._data
+                              if element["id"] not in results]
+            if self._total is not None:
+                self._total = max(self._total - len(results), 0)
+            for _id in results:
+                self._edited.pop(_id, None)
+            # Positions after the deleted elements are shifted
+            self._pages = {}
+            self._reindex()
+        return {
+            "deleted": len(results),
+            "failed": len(errors),
+            "errors": errors,
+            "seconds": seconds,
+            "throughput": len(results) / seconds if seconds else None,
+        }
+
+    def _schema(self):
+        """Return the datatypes of the type properties by key"""
+        return dict((prop.get("key", prop.get("label")), prop.get("type"))
+                    for prop in self.properties.data or [])
 
     def pull(self):
-        """Pull data from the server"""
-        func = getattr(self._api, "get_{}s".format(self._mode))
-        data = func(self._slug)
-        self._data = data.get("{}s".format(self._mode), [])
+        """
+        Pull data from the server. If it has not changed since the last
+        pull, and there are no local changes to drop, the data already
+        loaded is kept. In columnar mode, the data is pulled page by page
+        into columns typed after the type properties
+        """
+        conditional = self._api.conditional(
+            self._data is not None and not self._changed(), self._validators)
+        if self._columnar:
+            self._pull_columns(conditional)
+        else:
+            func = getattr(self._api, "get_{}s".format(self._mode))
+            try:
+                with conditional:
+                    data = func(self._slug)
+            except NotModified:
+                pass
+            else:
+                self._data = [self._dehydrate(element) for element
+                              in data.get("{}s".format(self._mode), [])]
+                self._total = len(self._data)
+                self._pages = {}
         self._to_add = []
+        self._edited.clear()
+        self._reindex()
+
+    def _pull_columns(self, conditional):
+        """
+        Pull the data into a `ColumnarStore` page by page, so only a page is
+        decoded at a time. Pages not modified since the last pull, as set by
+        the `conditional` context, are copied from the store loaded
+        """
+        previous = (self._data if isinstance(self._data, ColumnarStore)
+                    else None)
+        store = ColumnarStore(self._schema())
+        pager = _Pager(self._page_size)
+        modified = previous is None
+        with conditional:
+            while not pager.done:
+                offset = pager.offset
+                try:
+                    elements = self._fetch(limit=pager.page_size,
+                                           offset=offset)
+                    modified = True
+                except NotModified:
+                    elements = previous[offset:offset + pager.page_size]
+                store.extend(pager.feed(elements, self._total))
+        if modified or len(store) != len(previous):
+            self._data = store
+            self._pages = {}
+        self._total = len(self._data)
 
     @property
     def properties(self):
@@ -259,27 +1336,103 @@ class DataCollection(BaseCollection):
 class TypeCollection(BaseCollection):
     """TypeCollection class to handle collection of nodes or rels types"""
 
+    def __init__(self, api, mode, slug=None):
+        super(TypeCollection, self).__init__(api, mode, slug)
+        self._indexes = None  # Types by slug and by name
+
+    def _index(self):
+        """Return the indexes of types by slug and by name, built once"""
+        if self._indexes is None:
+            by_slug = dict((t["slug"], t) for t in self.data)
+            by_name = dict((t["name"], t) for t in self.data)
+            self._indexes = (by_slug, by_name)
+        return self._indexes
+
+    def __getitem__(self, key):
+        """
+        Return the type in a position or slice, or the type with slug or
+        name `key`. If not found, a `KeyError` is returned
+        """
+        _key = self.__keytransform__(key)
+        if isinstance(_key, (int, slice)):
+            return super(TypeCollection, self).__getitem__(_key)
+        by_slug, by_name = self._index()
+        if _key in by_slug:
+            return by_slug[_key]
+        elif _key in by_name:
+            return by_name[_key]
+        raise KeyError("{}type '{}' not found".format(self._mode, _key))
+
+    def _new(self, key):
+        """Return the new type with name `key`, if it has not been pushed"""
+        _key = self.__keytransform__(key)
+        for _type in self._to_add:
+            if _type.get("name") == _key:
+                return _type
+        return None
+
+    def __contains__(self, key):
+        """Check if there is a type with slug or name `key`"""
+        by_slug, by_name = self._index()
+        _key = self.__keytransform__(key)
+        return _key in by_slug or _key in by_name
+
     def push(self):
         """Push new data to the server for the datatype `datatype_slug`"""
         if self._to_add:
             func = getattr(self._api, "post_{}types".format(self._mode))
             func(params=self._to_add)
             self._to_add = []
+            # Slugs are set by the server, so types are pulled when needed
+            self._data = None
+            self._indexes = None
 
     def pull(self):
-        """Pull data from the server"""
+        """
+        Pull data from the server. If it has not changed since the last
+        pull, the data already loaded is kept
+        """
         func = getattr(self._api, "get_{}types".format(self._mode))
-        self._data = func()
+        try:
+            with self._api.conditional(self._data is not None,
+                                       self._validators):
+                self._data = func()
+        except NotModified:
+            pass
+        else:
+            self._indexes = None
         self._to_add = []
 
 
 class PropertyCollection(BaseCollection):
 
+    def push(self):
+        """
+        Push new properties to the server, in the order they were added.
+        If one fails, it and the following ones are kept for the next push
+        """
+        func = getattr(self._api,
+                       "post_{}type_schema_properties".format(self._mode))
+        while self._to_add:
+            func(self._slug, params=self._to_add[0])
+            self._to_add.pop(0)
+            # The schema changed, so properties are pulled when needed
+            self._data = None
+
     def pull(self):
-        """Pull type properties from the server"""
+        """
+        Pull type properties from the server. If they have not changed
+        since the last pull, the properties already loaded are kept
+        """
         func = getattr(self._api,
                        "get_{}type_schema_properties".format(self._mode))
-        self._data = func(self._slug)
+        try:
+            with self._api.conditional(self._data is not None,
+                                       self._validators):
+                data = func(self._slug)
+        except NotModified:
+            return
+        self._data = data
         if self._data:
             self._data = self._data["properties"]
 
@@ -295,9 +1448,42 @@ class SlumberTokenAuth():
 
 class API(object):
 
-    def __init__(self, token, graph_slug=None):
-        self._api = slumber.API(SYLVADB_API, auth=SlumberTokenAuth(token))
+    def __init__(self, token, graph_slug=None, session=None, cache=True,
+                 retry=True, rate_limit=None, metrics=True, serializer=None,
+                 lazy=False, compression=None):
+        # By default, all the APIs share the connection pools of a session
+        self._session = Session(session)
+        # Failed requests are retried with the default policy, unless set
+        if retry is True:
+            retry = RetryPolicy()
+        self._session.retry = retry or None
+        # Requests per second, or a rate limiter shared among APIs
+        if rate_limit is not None and not isinstance(rate_limit,
+                                                     RateLimiter):
+            rate_limit = RateLimiter(rate_limit)
+        self._session.rate_limiter = rate_limit
+        # Metrics of the requests by endpoint, that can be shared among APIs
+        if metrics is True:
+            metrics = Metrics()
+        self._session.metrics = metrics or None
+        # Request bodies are compressed with the encoding set, and responses
+        # always negotiated in the encodings that can be decoded
+        if compression and not isinstance(compression, Compression):
+            compression = Compression(
+                "gzip" if compression is True else compression)
+        self._session.compression = compression or Compression(None)
+        # JSON is handled by the fastest library available, unless set
+        self._serializer = get_serializer(serializer, lazy)
+        self._api = SlumberAPI(SYLVADB_API, auth=SlumberTokenAuth(token),
+                               session=self._session,
+                               serializer=self._serializer)
         self._slug = graph_slug
+        # By default, all the APIs share an in-memory cache. Responses are
+        # cached per server and token, but without keeping the token itself
+        self._cache = get_cache(cache)
+        self._origin = origin(SYLVADB_API, session)
+        self._token_hash = hashlib.sha1(
+            "{0}".format(token).encode("utf-8")).hexdigest()
 
     def __repr__(self):
         return "<SylvaDB API at {}>".format(hex(id(self)))
@@ -306,17 +1492,130 @@ class API(object):
         """Change the graph over with the API works"""
         self._slug = graph_slug
 
+    def _cache_key(self, func, args, kwargs):
+        """Return the key to cache a call to the method `func`"""
+        return (self._slug, func.__name__, self._token_hash,
+                repr(args), repr(sorted(kwargs.items())), self._origin)
+
+    def _cached_call(self, func, args, kwargs):
+        """Call to the method `func`, using the cache if possible"""
+        if self._cache is None or self._cache.ttl(func.__name__) is None:
+            with self._session.endpoint(func.__name__):
+                return func(self, *args, **kwargs)
+        key = self._cache_key(func, args, kwargs)
+        response = self._cache.get(key)
+        if response is None:
+            with self._session.endpoint(func.__name__):
+                response = materialize(func(self, *args, **kwargs))
+            self._cache.set(key, response)
+        return response
+
+    def _invalidating_call(self, func, args, kwargs):
+        """Call to the method `func`, invalidating the cache for the graph"""
+        try:
+            with self._session.endpoint(func.__name__):
+                return func(self, *args, **kwargs)
+        finally:
+            if self._cache is not None:
+                self._cache.invalidate(self._slug)
+
+    def conditional(self, enabled=True, validators=None):
+        """
+        Return a context manager keeping in the dictionary `validators` the
+        ETag or Last-Modified of the responses to the GET requests in it.
+        If `enabled`, the requests are made conditional on them, and if a
+        resource has not changed, `NotModified` is raised
+        """
+        return self._session.conditional(enabled, validators)
+
+    def _send(self, resource, method, **kwargs):
+        """
+        Send a request to the URL of a slumber `resource`, with the
+        arguments of `requests`, raising the slumber exceptions on errors
+        """
+        url = resource.url()
+        response = self._session.request(method, url, **kwargs)
+        if 400 <= response.status_code <= 499:
+            if response.status_code == 404:
+                exception_class = exceptions.HttpNotFoundError
+            else:
+                exception_class = exceptions.HttpClientError
+            raise exception_class("Client Error {}: {}".format(
+                response.status_code, url), response=response,
+                content=response.content)
+        elif 500 <= response.status_code <= 599:
+            raise exceptions.HttpServerError("Server Error {}: {}".format(
+                response.status_code, url), response=response,
+                content=response.content)
+        return response
+
+    def _stream(self, resource, chunk_size=STREAM_CHUNK_SIZE):
+        """Return a generator over the raw body of a GET to `resource`"""
+        response = self._send(resource, "GET", stream=True,
+                              headers={"Accept": "application/json"})
+
+        def chunks():
+            try:
+                for chunk in response.iter_content(chunk_size):
+                    yield chunk
+            finally:
+                response.close()
+        return chunks()
+
+    def _upload(self, resource, data, method="PUT"):
+        """
+        Send `data` to a slumber `resource`. It can be JSON serializable,
+        bytes, a binary file object or an iterable of bytes, uploaded with
+        chunked transfer encoding
+        """
+        if isinstance(data, (dict, list)):
+            data = self._serializer.dumps(data)
+        response = self._send(resource, method, data=data, headers={
+            "Accept": "application/json",
+            "Content-Type": "application/json",
+        })
+        return resource._process_response(response)
+
+    @property
+    def metrics(self):
+        """Metrics of the requests sent, `None` if disabled"""
+        return self._session.metrics
+
+    def register_hook(self, event, hook):
+        """
+        Register a `hook` called for every request sent, 'before' it with a
+        dictionary describing the request, or 'after' it with the same
+        dictionary, the response (`None` on errors) and the seconds taken
+        """
+        self._session.hooks[event].append(hook)
+
+    def deregister_hook(self, event, hook):
+        """Remove a `hook` registered for `event`"""
+        try:
+            self._session.hooks[event].remove(hook)
+            return True
+        except ValueError:
+            return False
+
+    def clear_cache(self):
+        """Remove all the responses cached"""
+        if self._cache is not None:
+            self._cache.clear()
+
     # Graphs methods
 
+    @cached
     def filter_graphs(self, params=None):
         """Filtering over graphs using params"""
         # TODO: Filter and search
         return self._api.graphs.filter(params)
 
+    @cached
     def get_graphs(self):
         """Get user graphs (collaborations too)"""
         return self._api.graphs.get()
 
+    @invalidates
     def post_graph(self, params=None):
         """Create a new graph"""
         # The params available are:
@@ -324,10 +1623,12 @@ class API(object):
         # - description
         return self._api.graphs.post(params)
 
+    @cached
     def get_graph(self):
         """Get the info about a graph"""
         return self._api.graphs(self._slug).get()
 
+    @invalidates
     def put_graph(self, params=None):
         """Modify info for a graph."""
         # The params available are (omitted ones are removed):
@@ -336,6 +1637,7 @@ class API(object):
         # - public
         return self._api.graphs(self._slug).put(params)
 
+    @invalidates
     def patch_graph(self, params=None):
         """Modify info for a graph."""
         # The params available are (omitted ones aren't treated):
@@ -344,41 +1646,75 @@ class API(object):
         # - public
         return self._api.graphs(self._slug).patch(params)
 
+    @invalidates
     def delete_graph(self):
         """Delete a graph."""
         return self._api.graphs(self._slug).delete()
 
     # Export and import methods
     # The methods that allow export are all GET
+    @cached
     def export_graph(self):
         """Export all the info for a graph."""
         return self._api.graphs(self._slug).export.graph.get()
 
+    @cached
     def export_schema(self):
         """Export the schema for a graph."""
         return self._api.graphs(self._slug).export.schema.get()
 
+    @cached
     def export_data(self):
         """Export the data for a graph."""
         return self._api.graphs(self._slug).export.data.get()
 
-    # The methods that allow import are all PUT
-    # def import_graph(self, params=None):
-    #     return self._api.graphs(self._slug).import.graph.put(params)
-
-    # def import_schema(self, params=None):
-    #     return self._api.graphs(self._slug).import.schema.put(params)
-
-    # def import_data(self, params=None):
-    #     return self._api.graphs(self._slug).import.data.put(params)
+    @endpoint
+    def export_graph_stream(self, chunk_size=STREAM_CHUNK_SIZE):
+        """Export all the info for a graph, as chunks of the raw JSON."""
+        return self._stream(self._api.graphs(self._slug).export.graph,
+                            chunk_size)
+
+    @endpoint
+    def export_schema_stream(self, chunk_size=STREAM_CHUNK_SIZE):
+        """Export the schema for a graph, as chunks of the raw JSON."""
+        return self._stream(self._api.graphs(self._slug).export.schema,
+                            chunk_size)
+
+    @endpoint
+    def export_data_stream(self, chunk_size=STREAM_CHUNK_SIZE):
+        """Export the data for a graph, as chunks of the raw JSON."""
+        return self._stream(self._api.graphs(self._slug).export.data,
+                            chunk_size)
+
+    # The methods that allow import are all PUT. The data can be streamed
+    # from a file object or a generator of bytes
+    @invalidates
+    def import_graph(self, data):
+        """Import all the info for a graph."""
+        resource = getattr(self._api.graphs(self._slug), "import").graph
+        return self._upload(resource, data)
+
+    @invalidates
+    def import_schema(self, data):
+        """Import the schema for a graph."""
+        resource = getattr(self._api.graphs(self._slug), "import").schema
+        return self._upload(resource, data)
+
+    @invalidates
+    def import_data(self, data):
+        """Import the data for a graph."""
+        resource = getattr(self._api.graphs(self._slug), "import").data
+        return self._upload(resource, data)
 
     # Schema methods
+    @cached
     def get_nodetypes(self):
         """Get node types for a graph."""
         return (self._api
                     .graphs(self._slug)
                     .types.nodes.get())
 
+    @invalidates
     def post_nodetypes(self, params):
         """Create node types for a graph."""
         # The params available are:
@@ -388,12 +1724,14 @@ class API(object):
                     .graphs(self._slug)
                     .types.nodes.post(params))
 
+    @cached
     def get_relationshiptypes(self):
         """Get relationship types for a graph."""
         return (self._api
                     .graphs(self._slug)
                     .types.relationships.get())
 
+    @invalidates
     def post_relationshiptypes(self, params):
         """Create relationship types for a graph."""
         # Required:
@@ -406,6 +1744,7 @@ class API(object):
                     .graphs(self._slug)
                     .types.relationships.post(params))
 
+    @cached
     def get_nodetype(self, nodetype_slug):
         """Get a single node type for a graph."""
         # Required:
@@ -414,6 +1753,7 @@ class API(object):
                     .graphs(self._slug)
                     .types.nodes(nodetype_slug).get())
 
+    @invalidates
     def delete_nodetype(self, nodetype_slug):
         """Delete a single node type for a graph."""
         # Required:
@@ -422,6 +1762,7 @@ class API(object):
                     .graphs(self._slug)
                     .types.nodes(nodetype_slug).delete())
 
+    @cached
     def get_nodetype_schema(self, nodetype_slug):
         """Get the schema for a node type."""
         # Required:
@@ -431,6 +1772,7 @@ class API(object):
                     .types.nodes(nodetype_slug)
                     .schema.get())
 
+    @invalidates
     def put_nodetype_schema(self, nodetype_slug, params=None):
         """Modify the schema for a node type."""
         # Required:
@@ -443,6 +1785,7 @@ class API(object):
                     .types.nodes(nodetype_slug)
                     .schema.put(params))
 
+    @invalidates
     def patch_nodetype_schema(self, nodetype_slug, params=None):
         """Modify the schema for a node type."""
         # Required:
@@ -455,6 +1798,7 @@ class API(object):
                     .types.nodes(nodetype_slug)
                     .schema.patch(params))
 
+    @cached
     def get_nodetype_schema_properties(self, nodetype_slug):
         """Get the properties from a schema for a node type."""
         # Required:
@@ -464,6 +1808,7 @@ class API(object):
                     .types.nodes(nodetype_slug)
                     .schema.properties.get())
 
+    @invalidates
     def post_nodetype_schema_properties(self, nodetype_slug, params=None):
         """Create a property from a schema for a node type"""
         # Required:
@@ -478,6 +1823,7 @@ class API(object):
                     .types.nodes(nodetype_slug)
                     .schema.properties.post(params))
 
+    @cached
     def get_relationshiptype(self, relationshiptype_slug):
         """Get a single relationship type for a graph."""
         # Required:
@@ -486,6 +1832,7 @@ class API(object):
                     .graphs(self._slug)
                     .types.relationships(relationshiptype_slug).get())
 
+    @invalidates
     def delete_relationshiptype(self, relationshiptype_slug):
         """Delete a single relationship type for a graph."""
         # Required:
@@ -494,6 +1841,7 @@ class API(object):
                     .graphs(self._slug)
                     .types.relationships(relationshiptype_slug).delete())
 
+    @cached
     def get_relationshiptype_schema(self, relationshiptype_slug):
         """Get the schema for a relationship type."""
         # Required:
@@ -503,6 +1851,7 @@ class API(object):
                     .types.relationships(relationshiptype_slug)
                     .schema.get())
 
+    @invalidates
     def put_relationshiptype_schema(self, relationshiptype_slug, params=None):
         """Modify the schema for a relationship type."""
         # Required:
@@ -515,6 +1864,7 @@ class API(object):
                     .types.relationships(relationshiptype_slug)
                     .schema.put(params))
 
+    @invalidates
     def patch_relationshiptype_schema(self, relationshiptype_slug,
                                       params=None):
         """Modify the schema for a relationship type."""
@@ -528,6 +1878,7 @@ class API(object):
                     .types.relationships(relationshiptype_slug)
                     .schema.patch(params))
 
+    @cached
     def get_relationshiptype_schema_properties(self, relationshiptype_slug):
         """Get the properties from a schema for a relationship type."""
         # Required:
@@ -537,6 +1888,7 @@ class API(object):
                     .types.relationships(relationshiptype_slug)
                     .schema.properties.get())
 
+    @invalidates
     def post_relationshiptype_schema_properties(self, relationshiptype_slug,
                                                 params=None):
         """Create a property from a schema for a relationship type"""
@@ -553,15 +1905,19 @@ class API(object):
                     .schema.properties.post(params))
 
     # Data methods
-    def get_nodes(self, nodetype_slug):
+    @cached
+    def get_nodes(self, nodetype_slug, limit=None, offset=None):
         """Get nodes for a node type."""
         # Required:
         # - nodetype_slug
+        # The params available are:
+        # - limit and offset, to get only a page of nodes
         return (self._api
                     .graphs(self._slug)
                     .types.nodes(nodetype_slug)
-                    .nodes.get())
+                    .nodes.get(**_paging(limit, offset)))
 
+    @invalidates
     def post_nodes(self, nodetype_slug, params=None):
         """Create nodes for a node type."""
         # Required:
@@ -575,6 +1931,7 @@ class API(object):
                     .types.nodes(nodetype_slug)
                     .nodes.post(params))
 
+    @cached
     def filter_nodes(self, nodetype_slug, limit=None, offset=None,
                      params=None):
         """Filtering over nodes for a node type using params."""
@@ -582,11 +1939,13 @@ class API(object):
         # - nodetype_slug
         # The params available are:
         # - The properties and their values to filter.
+        # - limit and offset, to get only a page of nodes
         return (self._api
                     .graphs(self._slug)
                     .types.nodes(nodetype_slug)
-                    .filter.post(params))
+                    .filter.post(params, **_paging(limit, offset)))
 
+    @cached
     def filter_nodes_get(self, nodetype_slug, limit=None, offset=None,
                          params=None):
         """Filtering over nodes for a node type using params."""
@@ -594,11 +1953,14 @@ class API(object):
         # - nodetype_slug
         # The params available are:
         # - The properties and their values to filter.
+        # - limit and offset, to get only a page of nodes
+        params = dict(params or {}, **_paging(limit, offset))
         return (self._api
                     .graphs(self._slug)
                     .types.nodes(nodetype_slug)
                     .filter.get(**params))
 
+    @cached
     def get_node(self, nodetype_slug, node_id):
         """Get info for a single node from a node type."""
         # Required:
@@ -609,6 +1971,7 @@ class API(object):
                     .types.nodes(nodetype_slug)
                     .nodes(node_id).get())
 
+    @invalidates
     def put_node(self, nodetype_slug, node_id, params=None):
         """Modify a single node from a node type."""
         # Required:
@@ -621,6 +1984,7 @@ class API(object):
                     .types.nodes(nodetype_slug)
                     .nodes(node_id).put(params))
 
+    @invalidates
     def patch_node(self, nodetype_slug, node_id, params=None):
         """Modify a single node from a node type."""
         # Required:
@@ -633,6 +1997,7 @@ class API(object):
                     .types.nodes(nodetype_slug)
                     .nodes(node_id).patch(params))
 
+    @invalidates
     def delete_node(self, nodetype_slug, node_id):
         """Remove a single node from a node type."""
         # Required:
@@ -643,15 +2008,20 @@ class API(object):
                     .types.nodes(nodetype_slug)
                     .nodes(node_id).delete())
 
-    def get_relationships(self, relationshiptype_slug):
+    @cached
+    def get_relationships(self, relationshiptype_slug, limit=None,
+                          offset=None):
         """Get relationships for a relationship type."""
         # Required:
         # - relationshiptype_slug
+        # The params available are:
+        # - limit and offset, to get only a page of relationships
         return (self._api
                     .graphs(self._slug)
                     .types.relationships(relationshiptype_slug)
-                    .relationships.get())
+                    .relationships.get(**_paging(limit, offset)))
 
+    @invalidates
     def post_relationships(self, relationshiptype_slug,
                            params=None):
         """Create relationships for a relationship type."""
@@ -666,6 +2036,36 @@ class API(object):
                     .types.relationships(relationshiptype_slug)
                     .relationships.post(params))
 
+    @cached
+    def filter_relationships(self, relationshiptype_slug, limit=None,
+                             offset=None, params=None):
+        """Filtering over relationships for a relationship type."""
+        # Required:
+        # - relationshiptype_slug
+        # The params available are:
+        # - The properties and their values to filter.
+        # - limit and offset, to get only a page of relationships
+        return (self._api
+                    .graphs(self._slug)
+                    .types.relationships(relationshiptype_slug)
+                    .filter.post(params, **_paging(limit, offset)))
+
+    @cached
+    def filter_relationships_get(self, relationshiptype_slug, limit=None,
+                                 offset=None, params=None):
+        """Filtering over relationships for a relationship type."""
+        # Required:
+        # - relationshiptype_slug
+        # The params available are:
+        # - The properties and their values to filter.
+        # - limit and offset, to get only a page of relationships
+        params = dict(params or {}, **_paging(limit, offset))
+        return (self._api
+                    .graphs(self._slug)
+                    .types.relationships(relationshiptype_slug)
+                    .filter.get(**params))
+
+    @cached
     def get_relationship(self, relationshiptype_slug,
                          relationship_id):
         """Get info for a single relationship from a relationship type."""
@@ -677,6 +2077,7 @@ class API(object):
                     .types.relationships(relationshiptype_slug)
                     .relationships(relationship_id).get())
 
+    @invalidates
     def put_relationship(self, relationshiptype_slug,
                          relationship_id, params=None):
         """Modify a single relationship from a relationship type."""
@@ -690,6 +2091,7 @@ class API(object):
                     .types.relationships(relationshiptype_slug)
                     .relationships(relationship_id).put(params))
 
+    @invalidates
     def patch_relationship(self, relationshiptype_slug,
                            relationship_id, params=None):
         """Modify a single relationship from a relationship type."""
@@ -703,6 +2105,7 @@ class API(object):
                     .types.relationships(relationshiptype_slug)
                     .relationships(relationship_id).patch(params))
 
+    @invalidates
     def delete_relationship(self, relationshiptype_slug,
                             relationship_id):
         """Remove a single relationship from a relationship type."""
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks of the client against a `MockServer`, reporting the operations
+per second and the peak memory of each one. The results can be saved as a
+baseline, and compared against it to catch regressions:
+
+    python -m sylvadbclient.benchmarks --save benchmarks/baseline.json
+    python -m sylvadbclient.benchmarks --compare benchmarks/baseline.json
+"""
+from __future__ import absolute_import, print_function, unicode_literals
+import argparse
+import io
+import json
+import sys
+import time
+from collections import OrderedDict
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+from .api import Graph, DataCollection, NODE
+from .mock import MockServer
+from .streams import read_export
+
+SIZE = 10000  # Number of nodes of the benchmark graphs
+REPEAT = 3  # Runs of each benchmark, keeping the fastest
+TOLERANCE = 0.25  # Slowdown over the baseline reported as a regression
+
+BENCHMARKS = OrderedDict()
+
+
+def benchmark(func):
+    """
+    Decorator registering a benchmark. It takes a server and a size, and
+    returns a function to run and the number of operations it does
+    """
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+def _graph(server, size, relationships=0):
+    server.populate("benchmark", nodes=size, relationships=relationships)
+    return Graph("benchmark", auth="benchmark", session=server.session())
+
+
+@benchmark
+def pull(server, size):
+    graph = _graph(server, size)
+
+    def run():
+        DataCollection(graph._api, NODE, "node").pull()
+    return run, size
+
+
+@benchmark
+def pull_columnar(server, size):
+    graph = _graph(server, size)
+
+    def run():
+        DataCollection(graph._api, NODE, "node", columnar=True).pull()
+    return run, size
+
+
+@benchmark
+def push(server, size):
+    graph = _graph(server, 0)
+
+    def run():
+        nodes = DataCollection(graph._api, NODE, "node")
+        for index in range(size):
+            nodes.add({"p0": index, "p1": "pushed", "p2": "pushed"})
+        nodes.push()
+    return run, size
+
+
+@benchmark
+def slicing(server, size):
+    graph = _graph(server, size)
+    slices = 100
+
+    def run():
+        nodes = DataCollection(graph._api, NODE, "node")
+        for index in range(slices):
+            start = (index * 7919) % size
+            nodes[start:start + 10]
+    return run, slices
+
+
+@benchmark
+def type_lookup(server, size):
+    graph = _graph(server, 0)
+
+    def run():
+        for _ in range(size):
+            graph.nodes.types["Node"]
+            graph.nodes["node"]
+    return run, size
+
+
+@benchmark
+def filtering(server, size):
+    graph = _graph(server, size)
+    filters = 10
+
+    def run():
+        nodes = DataCollection(graph._api, NODE, "node")
+        for index in range(filters):
+            list(nodes.filter(p0=(index * 7919) % size))
+    return run, filters
+
+
+@benchmark
+def export(server, size):
+    graph = _graph(server, size, relationships=size)
+
+    def run():
+        graph.export_to(io.BytesIO())
+    return run, size * 2
+
+
+@benchmark
+def export_read(server, size):
+    graph = _graph(server, size, relationships=size)
+    exported = io.BytesIO()
+    graph.export_to(exported)
+
+    def run():
+        exported.seek(0)
+        for _ in read_export(exported):
+            pass
+    return run, size * 2
+
+
+def _seconds(func):
+    start = time.time()
+    func()
+    return time.time() - start
+
+
+def _peak_memory(func):
+    """Return the peak of memory in bytes allocated while running `func`"""
+    if tracemalloc is None:
+        return None
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(names=None, size=SIZE, latency=0, repeat=REPEAT):
+    """
+    Run the benchmarks in `names`, or all of them, against a server that
+    waits `latency` seconds per request. Return their results by name
+    """
+    results = OrderedDict()
+    for name, func in BENCHMARKS.items():
+        if names and name not in names:
+            continue
+        bench, ops = func(MockServer(latency=latency), size)
+        # Memory is measured apart, since tracing slows down the run
+        seconds = min(_seconds(bench) for _ in range(repeat))
+        results[name] = {
+            "ops": ops,
+            "seconds": seconds,
+            "ops_per_sec": ops / seconds if seconds else None,
+            "peak_memory": _peak_memory(bench),
+        }
+    return results
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """
+    Return the benchmarks slower than in `baseline` by more than
+    `tolerance`, with the ratio of their operations per second
+    """
+    regressions = OrderedDict()
+    for name, result in results.items():
+        expected = baseline.get(name, {}).get("ops_per_sec")
+        if not expected or not result["ops_per_sec"]:
+            continue
+        ratio = result["ops_per_sec"] / expected
+        if ratio < 1 - tolerance:
+            regressions[name] = ratio
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("names", nargs="*", help="benchmarks to run")
+    parser.add_argument("--size", type=int, default=SIZE)
+    parser.add_argument("--latency", type=float, default=0,
+                        help="seconds per request of the mock server")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--save", help="path to save the results to")
+    parser.add_argument("--compare", help="path of a baseline to compare")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args(argv)
+    results = run(args.names, args.size, args.latency, args.repeat)
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+    print("{:<16}{:>14}{:>14}{:>14}".format("benchmark", "ops/sec",
+                                            "peak KiB", "baseline"))
+    for name, result in results.items():
+        expected = baseline.get(name, {}).get("ops_per_sec")
+        print("{:<16}{:>14.1f}{:>14}{:>14}".format(
+            name, result["ops_per_sec"] or 0,
+            "-" if result["peak_memory"] is None
+            else result["peak_memory"] // 1024,
+            "-" if not expected else "{:.1f}".format(expected)))
+    if args.save:
+        with open(args.save, "w") as results_file:
+            json.dump(results, results_file, indent=2)
+    regressions = compare(results, baseline, args.tolerance)
+    for name, ratio in regressions.items():
+        print("Regression in {}: {:.0%} of the baseline".format(name, ratio))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
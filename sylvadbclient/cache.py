@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+import copy
+import shelve
+import threading
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+
+CACHE_SIZE = 1024
+# Seconds to keep the responses of each API method, the rest are not cached
+TTLS = {
+    "get_nodetypes": 60,
+    "get_relationshiptypes": 60,
+    "get_nodetype": 60,
+    "get_relationshiptype": 60,
+    "get_nodetype_schema": 60,
+    "get_relationshiptype_schema": 60,
+    "get_nodetype_schema_properties": 60,
+    "get_relationshiptype_schema_properties": 60,
+}
+# Methods listing graphs, invalidated by changes in any graph
+GRAPHS_METHODS = ("get_graphs", "filter_graphs")
+
+_origins = weakref.WeakKeyDictionary()  # Unique IDs of the sessions
+_origins_lock = threading.Lock()
+
+
+def origin(base_url, session=None):
+    """
+    Return the origin of the responses sent through `session` to
+    `base_url`, so they are cached apart from other servers. The shared
+    sessions, used if `session` is `None`, only depend on `base_url`
+    """
+    if session is None:
+        return base_url
+    with _origins_lock:
+        try:
+            return (base_url, _origins.setdefault(session, uuid.uuid4().hex))
+        except TypeError:
+            # Not weak referenceable
+            return (base_url, id(session))
+
+
+class Cache(object):
+    """
+    In-memory LRU cache of API responses. Keys are tuples starting with the
+    graph slug and the API method, and entries expire after the TTL in
+    seconds set for the method in `ttls`
+    """
+
+    def __init__(self, maxsize=CACHE_SIZE, ttls=None):
+        self.maxsize = maxsize
+        self.ttls = dict(TTLS if ttls is None else ttls)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return "<SylvaDB Cache at {}>".format(hex(id(self)))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def ttl(self, method):
+        """Return the TTL for `method`, `None` if it is not cached"""
+        return self.ttls.get(method)
+
+    def get(self, key, default=None):
+        """Return a copy of the value for `key`, if it has not expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires, value = entry
+            if expires < time.time():
+                del self._entries[key]
+                return default
+            # Recently used entries are moved to the end
+            del self._entries[key]
+            self._entries[key] = entry
+        return copy.deepcopy(value)
+
+    def set(self, key, value):
+        """Store `value` for `key` if its method has a TTL"""
+        ttl = self.ttl(key[1])
+        if ttl is None:
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.time() + ttl, copy.deepcopy(value))
+            while len(self._entries) > self.maxsize:
+                # Evict the least recently used entry
+                self._entries.popitem(last=False)
+
+    def invalidate(self, graph_slug):
+        """Remove the entries for `graph_slug` and the graphs listings"""
+        with self._lock:
+            for key in list(self._entries):
+                if key[0] == graph_slug or key[1] in GRAPHS_METHODS:
+                    del self._entries[key]
+
+    def clear(self):
+        """Remove all the entries"""
+        with self._lock:
+            self._entries.clear()
+
+
+class DiskCache(Cache):
+    """
+    Cache of API responses stored on disk with `shelve`, so it can be kept
+    between processes. When full, the entries closer to expire are removed.
+    The keys are indexed in memory by graph slug, so invalidating a graph
+    only touches its entries
+    """
+
+    def __init__(self, path, maxsize=CACHE_SIZE, ttls=None):
+        super(DiskCache, self).__init__(maxsize, ttls)
+        self.path = path
+        self._entries = shelve.open(path)
+        self._keys = {}  # Keys and expiration times by stored key
+        self._slugs = {}  # Stored keys by graph slug
+        self._listings = set()  # Stored keys of the graphs listings
+        for _repr, (key, expires, _) in self._entries.items():
+            self._index(_repr, key, expires)
+
+    def __repr__(self):
+        return "<SylvaDB DiskCache of {} at {}>".format(self.path,
+                                                        hex(id(self)))
+
+    def _index(self, _repr, key, expires):
+        self._keys[_repr] = (key, expires)
+        self._slugs.setdefault(key[0], set()).add(_repr)
+        if key[1] in GRAPHS_METHODS:
+            self._listings.add(_repr)
+
+    def _remove(self, _repr):
+        key, _ = self._keys.pop(_repr)
+        reprs = self._slugs[key[0]]
+        reprs.discard(_repr)
+        if not reprs:
+            del self._slugs[key[0]]
+        self._listings.discard(_repr)
+        del self._entries[_repr]
+
+    def get(self, key, default=None):
+        """Return the value for `key`, if it has not expired"""
+        with self._lock:
+            _repr = repr(key)
+            if _repr not in self._keys:
+                return default
+            if self._keys[_repr][1] < time.time():
+                self._remove(_repr)
+                return default
+            entry = self._entries.get(_repr)
+        return default if entry is None else entry[2]
+
+    def set(self, key, value):
+        """Store `value` for `key` if its method has a TTL"""
+        ttl = self.ttl(key[1])
+        if ttl is None:
+            return
+        with self._lock:
+            _repr = repr(key)
+            expires = time.time() + ttl
+            self._entries[_repr] = (key, expires, value)
+            self._index(_repr, key, expires)
+            if len(self._keys) > self.maxsize:
+                expiring = sorted(self._keys,
+                                  key=lambda _repr: self._keys[_repr][1])
+                for _repr in expiring[:-self.maxsize]:
+                    self._remove(_repr)
+            self._entries.sync()
+
+    def invalidate(self, graph_slug):
+        """Remove the entries for `graph_slug` and the graphs listings"""
+        with self._lock:
+            reprs = self._slugs.get(graph_slug, set()) | self._listings
+            if not reprs:
+                return
+            for _repr in reprs:
+                self._remove(_repr)
+            self._entries.sync()
+
+    def clear(self):
+        """Remove all the entries"""
+        with self._lock:
+            self._entries.clear()
+            self._keys.clear()
+            self._slugs.clear()
+            self._listings.clear()
+            self._entries.sync()
+
+    def close(self):
+        """Close the underlying shelve"""
+        self._entries.close()
+
+
+_cache = Cache()
+
+
+def get_cache(cache=True):
+    """
+    Return the cache to use for `cache`: the in-memory cache shared by
+    default among the APIs if `True`, none if `False`, or `cache` itself
+    """
+    if cache is True:
+        return _cache
+    elif cache is False:
+        return None
+    return cache
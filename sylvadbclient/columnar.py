@@ -0,0 +1,407 @@
+# -*- coding: utf-8 -*-
+"""
+Columnar storage for pulled collections. Instead of a dictionary per
+element, ids and each property are kept in their own column, typed arrays
+for numbers and booleans, and lists of interned values for the rest
+"""
+from __future__ import absolute_import, unicode_literals
+from array import array
+from itertools import chain
+try:
+    from collections.abc import Mapping, MutableMapping
+except ImportError:
+    from collections import Mapping, MutableMapping  # NOQA
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+try:
+    import pandas
+except ImportError:
+    pandas = None
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+try:
+    INTEGERS = (int, long)
+except NameError:
+    INTEGERS = (int, )
+STRINGS = (str, type(""))
+try:
+    INTEGER = array("q").typecode
+except ValueError:
+    # Python 2 has no long long arrays, larger values turn into objects
+    INTEGER = "l"
+
+# Array typecodes for the SylvaDB datatypes, the rest are kept as objects
+TYPECODES = {
+    "number": INTEGER,
+    "auto_increment": INTEGER,
+    "auto_increment_update": INTEGER,
+    "float": "d",
+    "boolean": "b",
+}
+# Types of the values accepted by each typecode
+ACCEPTED = {
+    INTEGER: INTEGERS,
+    "d": (float, ) + INTEGERS,
+    "b": (bool, ),
+}
+# Flags of the values in a column
+MISSING, VALUE, NONE = 0, 1, 2
+# NumPy dtypes of the typecodes
+DTYPES = {
+    INTEGER: "int64",
+    "d": "float64",
+    "b": "bool",
+}
+
+
+class Column(object):
+    """
+    Values of a property for all the rows. Values that do not fit in the
+    typed array turn the column into a list of objects
+    """
+    __slots__ = ("typecode", "values", "flags", "pool")
+
+    def __init__(self, typecode=None, length=0, pool=None):
+        self.typecode = typecode
+        if typecode is None:
+            self.values = [None] * length
+        else:
+            self.values = array(typecode, [0] * length)
+        self.flags = bytearray(length)
+        self.pool = pool if pool is not None else {}
+
+    def __len__(self):
+        return len(self.flags)
+
+    def _to_objects(self):
+        """Turn the column into a list of objects"""
+        values = self.values.tolist()
+        if self.typecode == "b":
+            values = [bool(value) for value in values]
+        self.typecode = None
+        self.values = values
+
+    def _prepare(self, value):
+        """Return the value to store, interning strings"""
+        if self.typecode is not None:
+            if type(value) in ACCEPTED[self.typecode]:
+                return value
+            self._to_objects()
+        if isinstance(value, STRINGS):
+            return self.pool.setdefault(value, value)
+        return value
+
+    def append(self, value=None, flag=VALUE):
+        """Append a value, or an empty one if `flag` is not `VALUE`"""
+        if flag == VALUE and value is None:
+            flag = NONE
+        if flag == VALUE:
+            value = self._prepare(value)
+        elif self.typecode is not None:
+            value = 0
+        try:
+            self.values.append(value)
+        except OverflowError:
+            self._to_objects()
+            self.values.append(value)
+        self.flags.append(flag)
+
+    def get(self, index):
+        """Return the value of the row `index`, `KeyError` if missing"""
+        flag = self.flags[index]
+        if flag == MISSING:
+            raise KeyError(index)
+        elif flag == NONE:
+            return None
+        value = self.values[index]
+        return bool(value) if self.typecode == "b" else value
+
+    def has(self, index):
+        """Check if the row `index` has a value"""
+        return self.flags[index] != MISSING
+
+    def set(self, index, value):
+        """Set the value of the row `index`"""
+        if value is None:
+            self.flags[index] = NONE
+            return
+        value = self._prepare(value)
+        try:
+            self.values[index] = value
+        except OverflowError:
+            self._to_objects()
+            self.values[index] = value
+        self.flags[index] = VALUE
+
+    def delete(self, index):
+        """Remove the value of the row `index`"""
+        self.flags[index] = MISSING
+
+
+class RowProperties(MutableMapping):
+    """Properties of a row, read and written through the columns"""
+    __slots__ = ("_store", "_index")
+
+    def __init__(self, store, index):
+        self._store = store
+        self._index = index
+
+    def __getitem__(self, key):
+        column = self._store.columns.get(key)
+        if column is None:
+            raise KeyError(key)
+        try:
+            return column.get(self._index)
+        except KeyError:
+            raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        self._store.set(self._index, key, value)
+        self.changed.add(key)
+
+    def __delitem__(self, key):
+        column = self._store.columns.get(key)
+        if column is None or not column.has(self._index):
+            raise KeyError(key)
+        column.delete(self._index)
+        self.changed.add(key)
+
+    def __iter__(self):
+        for key, column in self._store.columns.items():
+            if column.has(self._index):
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+    @property
+    def changed(self):
+        """Keys changed since the row was pulled or pushed"""
+        return self._store.changed.setdefault(self._index, set())
+
+    def changes(self):
+        """Return the changed properties, with `None` for removed ones"""
+        return dict((key, self.get(key)) for key in self.changed)
+
+
+class Row(Mapping):
+    """Lightweight view of an element stored in a `ColumnarStore`"""
+    __slots__ = ("_store", "_index")
+
+    def __init__(self, store, index):
+        self._store = store
+        self._index = index
+
+    def __getitem__(self, key):
+        if key == "id":
+            return self._store.ids.get(self._index)
+        elif key == "properties":
+            return RowProperties(self._store, self._index)
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key == "id":
+            self._store.ids.set(self._index, value)
+        elif key == "properties":
+            self._store.set_properties(self._index, value)
+        else:
+            raise KeyError(key)
+
+    def __iter__(self):
+        return iter(("id", "properties"))
+
+    def __len__(self):
+        return 2
+
+    def __repr__(self):
+        return repr({"id": self["id"], "properties": dict(self["properties"])})
+
+
+class ColumnarStore(object):
+    """
+    Sequence of elements stored by columns. `schema` is a dictionary of
+    SylvaDB datatypes by property key, used to type the columns; properties
+    out of the schema are stored as objects
+    """
+
+    def __init__(self, schema=None):
+        self.pool = {}  # Interned strings, shared by all the columns
+        self.ids = Column(INTEGER, pool=self.pool)
+        self.columns = {}
+        self.changed = {}  # Changed keys by row
+        self._typecodes = dict((key, TYPECODES.get(datatype))
+                               for key, datatype in (schema or {}).items())
+        for key in self._typecodes:
+            self._column(key)
+
+    def __repr__(self):
+        return "<SylvaDB ColumnarStore of {} elements at {}>".format(
+            len(self), hex(id(self)))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [Row(self, index)
+                    for index in range(*key.indices(len(self)))]
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("element index out of range")
+        return Row(self, key)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield Row(self, index)
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __iadd__(self, elements):
+        self.extend(elements)
+        return self
+
+    def _column(self, key):
+        """Return the column for `key`, creating it if needed"""
+        if key not in self.columns:
+            self.columns[key] = Column(self._typecodes.get(key), len(self),
+                                       self.pool)
+        return self.columns[key]
+
+    def append(self, element):
+        """Append an element dictionary, or a row"""
+        properties = element.get("properties") or {}
+        for key in properties:
+            self._column(key)
+        self.ids.append(element["id"])
+        for key, column in self.columns.items():
+            if key in properties:
+                column.append(properties[key])
+            else:
+                column.append(flag=MISSING)
+
+    def extend(self, elements):
+        """Append all the `elements`"""
+        for element in elements:
+            self.append(element)
+
+    def set(self, index, key, value):
+        """Set the property `key` of the row `index`"""
+        self._column(key).set(index, value)
+
+    def set_properties(self, index, properties):
+        """Replace all the properties of the row `index`"""
+        for key in properties:
+            self._column(key)
+        for key, column in self.columns.items():
+            if key in properties:
+                column.set(index, properties[key])
+            else:
+                column.delete(index)
+        self.changed.pop(index, None)
+
+    def changed_elements(self):
+        """Return the rows with changed properties, and their changes"""
+        rows = [Row(self, index) for index, keys in self.changed.items()
+                if keys]
+        return [(row, row["properties"].changes()) for row in rows
+                if row["id"] is not None]
+
+    def without(self, ids):
+        """Return a new store without the elements with ID in `ids`"""
+        store = ColumnarStore()
+        store._typecodes = self._typecodes
+        for row in self:
+            if row["id"] not in ids:
+                changed = self.changed.get(row._index)
+                store.append(row)
+                if changed:
+                    store.changed[len(store) - 1] = set(changed)
+        return store
+
+
+def _masked(column, copy=True):
+    """
+    Return the typed values of `column` and the mask of empty ones. If not
+    `copy`, the values share the memory of the column, that cannot grow
+    while they are in use
+    """
+    values = numpy.frombuffer(column.values, dtype=column.values.typecode)
+    values = values.astype(DTYPES[column.typecode], copy=copy)
+    mask = numpy.frombuffer(column.flags, dtype="uint8") != VALUE
+    return values, mask
+
+
+def _require(module, name):
+    if module is None:
+        raise ImportError("{} is required for this export".format(name))
+
+
+def to_numpy(store, copy=True):
+    """
+    Return a dictionary of NumPy arrays by property, and the IDs in 'id'.
+    Typed columns are masked arrays if some values are empty, and share the
+    memory of the store if not `copy`
+    """
+    _require(numpy, "numpy")
+    arrays = {}
+    for key, column in chain([("id", store.ids)], store.columns.items()):
+        if column.typecode is None:
+            values = numpy.empty(len(column), dtype=object)
+            values[:] = [column.get(index) if column.has(index) else None
+                         for index in range(len(column))]
+        else:
+            values, mask = _masked(column, copy)
+            if mask.any():
+                values = numpy.ma.masked_array(values, mask=mask)
+        arrays[key] = values
+    return arrays
+
+
+def to_pandas(store, copy=True):
+    """
+    Return a `pandas.DataFrame` indexed by ID, with a column per property.
+    Typed columns with empty values use the nullable dtypes
+    """
+    _require(pandas, "pandas")
+    _require(numpy, "numpy")
+    arrays = to_numpy(store, copy)
+    ids = arrays.pop("id")
+    columns = {}
+    for key, values in arrays.items():
+        if isinstance(values, numpy.ma.MaskedArray):
+            values = pandas.array(values.data, dtype={
+                "int64": "Int64", "float64": "Float64", "bool": "boolean",
+            }[values.dtype.name])
+            values[arrays[key].mask] = None
+        columns[key] = values
+    return pandas.DataFrame(columns, index=pandas.Index(ids, name="id"),
+                            columns=list(arrays))
+
+
+def to_arrow(store, copy=True):
+    """Return a `pyarrow.Table` with the IDs in 'id' and the properties"""
+    _require(pyarrow, "pyarrow")
+    names, arrays = [], []
+    for key, column in chain([("id", store.ids)], store.columns.items()):
+        if column.typecode is None or numpy is None:
+            values = pyarrow.array([
+                column.get(index) if column.has(index) else None
+                for index in range(len(column))
+            ])
+        else:
+            values, mask = _masked(column, copy)
+            values = pyarrow.array(values, mask=mask if mask.any() else None)
+        names.append(key)
+        arrays.append(values)
+    return pyarrow.Table.from_arrays(arrays, names=names)
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+Metrics of the requests sent by the APIs, by endpoint (the API method that
+sent them), and exporters to Prometheus and OpenTelemetry
+"""
+from __future__ import absolute_import, unicode_literals
+import threading
+from bisect import bisect_left
+try:
+    from opentelemetry import trace
+except ImportError:
+    trace = None
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class Histogram(object):
+    """Histogram of values counted in buckets by their upper bound"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0
+        self.count = 0
+
+    def __repr__(self):
+        return "<SylvaDB Histogram of {} values at {}>".format(
+            self.count, hex(id(self)))
+
+    def observe(self, value):
+        """Count `value` in its bucket"""
+        index = bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """Return the cumulative counts by bucket, ending with the total"""
+        counts, total = [], 0
+        for count in self.counts:
+            total += count
+            counts.append(total)
+        return counts + [self.count]
+
+
+class Metrics(object):
+    """
+    Counters of requests, errors and bytes, and latency histograms, by
+    endpoint. It can be shared among APIs
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.reset()
+
+    def __repr__(self):
+        return "<SylvaDB Metrics at {}>".format(hex(id(self)))
+
+    def reset(self):
+        """Remove all the recorded values"""
+        with self._lock:
+            self._requests = {}  # Requests by endpoint and status
+            self._sent = {}
+            self._received = {}
+            self._latencies = {}
+
+    def record(self, endpoint, status, seconds, sent=0, received=0):
+        """
+        Record a request to `endpoint` that got a response with `status`,
+        or `None` on connection errors, in `seconds`
+        """
+        with self._lock:
+            key = (endpoint, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+            self._sent[endpoint] = self._sent.get(endpoint, 0) + sent
+            self._received[endpoint] = (self._received.get(endpoint, 0)
+                                        + received)
+            if endpoint not in self._latencies:
+                self._latencies[endpoint] = Histogram(self.buckets)
+            self._latencies[endpoint].observe(seconds)
+
+    def snapshot(self):
+        """Return a dictionary with the metrics by endpoint"""
+        with self._lock:
+            endpoints = {}
+            for (endpoint, status), count in self._requests.items():
+                metrics = endpoints.setdefault(endpoint, {
+                    "requests": 0,
+                    "errors": 0,
+                    "statuses": {},
+                    "bytes_sent": self._sent[endpoint],
+                    "bytes_received": self._received[endpoint],
+                    "seconds": self._latencies[endpoint].sum,
+                    "latency": dict(zip(
+                        [str(bucket) for bucket in self.buckets] + ["+Inf"],
+                        self._latencies[endpoint].cumulative())),
+                })
+                metrics["requests"] += count
+                metrics["statuses"][status] = count
+                if status is None or status >= 400:
+                    metrics["errors"] += count
+            return endpoints
+
+    def to_prometheus(self, prefix="sylvadb"):
+        """Return the metrics in the Prometheus text exposition format"""
+        with self._lock:
+            lines = [
+                "# HELP {}_requests_total Requests sent by endpoint and "
+                "status".format(prefix),
+                "# TYPE {}_requests_total counter".format(prefix),
+            ]
+            for (endpoint, status), count in sorted(
+                    self._requests.items(), key=lambda item: (
+                        item[0][0], str(item[0][1]))):
+                lines.append(
+                    '{}_requests_total{{endpoint="{}",status="{}"}} {}'.format(
+                        prefix, endpoint,
+                        "error" if status is None else status, count))
+            for name, values, description in (
+                    ("sent", self._sent, "Bytes sent"),
+                    ("received", self._received, "Bytes received")):
+                lines.append("# HELP {}_bytes_{}_total {} by endpoint".format(
+                    prefix, name, description))
+                lines.append("# TYPE {}_bytes_{}_total counter".format(
+                    prefix, name))
+                for endpoint, value in sorted(values.items()):
+                    lines.append(
+                        '{}_bytes_{}_total{{endpoint="{}"}} {}'.format(
+                            prefix, name, endpoint, value))
+            lines.append("# HELP {}_request_duration_seconds Latency of the "
+                         "requests by endpoint".format(prefix))
+            lines.append("# TYPE {}_request_duration_seconds histogram".format(
+                prefix))
+            for endpoint, histogram in sorted(self._latencies.items()):
+                bounds = [str(bucket) for bucket in histogram.buckets]
+                for bound, count in zip(bounds + ["+Inf"],
+                                        histogram.cumulative()):
+                    lines.append(
+                        '{}_request_duration_seconds_bucket{{endpoint="{}",'
+                        'le="{}"}} {}'.format(prefix, endpoint, bound, count))
+                lines.append(
+                    '{}_request_duration_seconds_sum{{endpoint="{}"}} {}'
+                    .format(prefix, endpoint, histogram.sum))
+                lines.append(
+                    '{}_request_duration_seconds_count{{endpoint="{}"}} {}'
+                    .format(prefix, endpoint, histogram.count))
+        return "\n".join(lines) + "\n"
+
+
+class OpenTelemetryHooks(object):
+    """
+    Request hooks tracing every request as an OpenTelemetry client span,
+    named after its endpoint. Register them with `install`
+    """
+
+    def __init__(self, tracer=None):
+        if trace is None:
+            raise ImportError("opentelemetry-api is required for tracing")
+        self.tracer = tracer or trace.get_tracer("sylvadbclient")
+
+    def __repr__(self):
+        return "<SylvaDB OpenTelemetryHooks at {}>".format(hex(id(self)))
+
+    def install(self, api):
+        """Register the hooks in `api`"""
+        api.register_hook("before", self.before)
+        api.register_hook("after", self.after)
+
+    def before(self, request):
+        request["span"] = self.tracer.start_span(
+            request["endpoint"], kind=trace.SpanKind.CLIENT, attributes={
+                "http.method": request["method"],
+                "http.url": request["url"],
+                "sylvadb.attempt": request["attempt"],
+            })
+
+    def after(self, request, response, seconds):
+        span = request.pop("span", None)
+        if span is None:
+            return
+        if response is not None:
+            # Responses of requests, or of aiohttp for the asyncio clients
+            status = getattr(response, "status_code", None)
+            if status is None:
+                status = response.status
+            span.set_attribute("http.status_code", status)
+            if status >= 400:
+                span.set_status(trace.Status(trace.StatusCode.ERROR))
+        elif request.get("error") is not None:
+            span.record_exception(request["error"])
+            span.set_status(trace.Status(trace.StatusCode.ERROR))
+        span.end()
@@ -0,0 +1,371 @@
+# -*- coding: utf-8 -*-
+"""
+In-process stand-in for the SylvaDB REST API, for offline tests and
+benchmarks. It is a `requests` transport adapter, so the APIs use it through
+a session without any network:
+
+    server = MockServer(latency=0.01)
+    server.populate("graph-1", nodes=1000, properties=5)
+    graph = Graph("graph-1", auth="token", session=server.session())
+"""
+from __future__ import absolute_import, unicode_literals
+import hashlib
+import io
+import json
+import re
+import threading
+import time
+import zlib
+try:
+    from urllib.parse import parse_qsl, urlsplit
+except ImportError:
+    from urlparse import parse_qsl, urlsplit  # NOQA
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from .api import SYLVADB_API, NODE, RELATIONSHIP
+from .session import new_session
+
+MODES = {"nodes": NODE, "relationships": RELATIONSHIP}
+REASONS = {
+    200: "OK", 201: "Created", 204: "No Content", 304: "Not Modified",
+    400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+}
+
+
+def _slugify(name):
+    return re.sub(r"[^a-z0-9]+", "-", "{}".format(name).lower()).strip("-")
+
+
+class MockGraph(object):
+    """Graph stored in memory by a `MockServer`"""
+
+    def __init__(self, slug, name=None, description="", public=False):
+        self.attrs = {
+            "slug": slug,
+            "name": name or slug,
+            "description": description,
+            "public": public,
+        }
+        self.types = {NODE: {}, RELATIONSHIP: {}}  # Types by slug
+        self.properties = {NODE: {}, RELATIONSHIP: {}}  # Lists by type
+        self.elements = {NODE: {}, RELATIONSHIP: {}}  # Dicts by type and ID
+
+    def add_type(self, mode, params):
+        slug = _slugify(params["name"])
+        self.types[mode][slug] = dict(params, slug=slug)
+        self.properties[mode][slug] = []
+        self.elements[mode][slug] = {}
+        return self.types[mode][slug]
+
+    def export(self, data=True, schema=True):
+        exported = {"graph": dict(self.attrs)}
+        if schema:
+            exported["schema"] = dict(
+                ("{}Types".format(mode), [
+                    dict(_type, properties=self.properties[mode][slug])
+                    for slug, _type in self.types[mode].items()])
+                for mode in (NODE, RELATIONSHIP))
+        if data:
+            for key, mode in MODES.items():
+                exported[key] = dict(
+                    (slug, list(elements.values()))
+                    for slug, elements in self.elements[mode].items())
+        return exported
+
+
+class MockServer(object):
+    """
+    Server keeping graphs in memory and answering the SylvaDB API. Every
+    request waits `latency` seconds before being answered
+    """
+
+    def __init__(self, latency=0, base_url=SYLVADB_API):
+        self.latency = latency
+        self.base_url = base_url
+        self.graphs = {}
+        self.requests = 0  # Number of requests answered
+        self._ids = 0
+        self._lock = threading.RLock()
+
+    def __repr__(self):
+        return "<SylvaDB MockServer at {}>".format(hex(id(self)))
+
+    def session(self, **kwargs):
+        """Return a new `requests` session sending requests to the server"""
+        session = new_session(**kwargs)
+        session.mount(self.base_url, MockAdapter(self))
+        return session
+
+    def _next_id(self):
+        self._ids += 1
+        return self._ids
+
+    def create_graph(self, slug, name=None, description="", public=False):
+        """Create an empty graph"""
+        with self._lock:
+            self.graphs[slug] = MockGraph(slug, name, description, public)
+            return self.graphs[slug]
+
+    def populate(self, slug, nodes=100, relationships=0, properties=3,
+                 size=16, nodetype="Node", relationshiptype="Link"):
+        """
+        Create a graph with `nodes` nodes of `nodetype` and `relationships`
+        relationships among them, with `properties` properties each: a
+        number 'p0', and strings of `size` characters
+        """
+        with self._lock:
+            graph = self.graphs.get(slug) or self.create_graph(slug)
+            for mode, name in ((NODE, nodetype),
+                               (RELATIONSHIP, relationshiptype)):
+                _type = graph.add_type(mode, {"name": name,
+                                              "description": ""})
+                graph.properties[mode][_type["slug"]] = [{
+                    "label": "p{}".format(index),
+                    "description": "",
+                    "type": "number" if index == 0 else "default",
+                } for index in range(properties)]
+            node_slug = _slugify(nodetype)
+            ids = []
+            for index in range(nodes):
+                _id = self._next_id()
+                ids.append(_id)
+                graph.elements[NODE][node_slug][_id] = {
+                    "id": _id, "properties": self._properties(
+                        index, properties, size)}
+            elements = graph.elements[RELATIONSHIP][_slugify(
+                relationshiptype)]
+            for index in range(relationships if ids else 0):
+                _id = self._next_id()
+                values = self._properties(index, properties, size)
+                values["source_id"] = ids[index % len(ids)]
+                values["target_id"] = ids[(index * 7 + 1) % len(ids)]
+                elements[_id] = {"id": _id, "properties": values}
+            return graph
+
+    @staticmethod
+    def _properties(index, properties, size):
+        values = {}
+        for key in range(properties):
+            if key == 0:
+                values["p0"] = index
+            else:
+                value = "{}-{}-".format(key, index)
+                values["p{}".format(key)] = (value * size)[:size]
+        return values
+
+    def handle(self, method, url, body=None):
+        """Answer a request, returning the status and the JSON response"""
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.requests += 1
+            parts = urlsplit(url)
+            path = parts.path[len(urlsplit(self.base_url).path):]
+            segments = [segment for segment in path.split("/") if segment]
+            params = dict(parse_qsl(parts.query))
+            if body:
+                body = json.loads(body.decode("utf-8")
+                                  if isinstance(body, bytes) else body)
+            try:
+                return self._route(method, segments, params, body)
+            except (KeyError, IndexError):
+                return 404, None
+
+    def _route(self, method, segments, params, body):
+        if segments[0] != "graphs":
+            raise KeyError(segments[0])
+        if len(segments) == 1:
+            if method == "GET":
+                return 200, [graph.attrs for graph in self.graphs.values()]
+            graph = self.create_graph(_slugify(body["name"]), **body)
+            return 201, graph.attrs
+        if segments[1] == "filter":
+            return 200, [graph.attrs for graph in self.graphs.values()]
+        graph = self.graphs[segments[1]]
+        rest = segments[2:]
+        if not rest:
+            return self._graph(method, graph, body)
+        elif rest[0] == "export":
+            return 200, graph.export(data=rest[1] != "schema",
+                                     schema=rest[1] != "data")
+        elif rest[0] == "import":
+            return self._import(graph, rest[1], body)
+        elif rest[0] == "types":
+            return self._types(method, graph, MODES[rest[1]], rest[2:],
+                               params, body)
+        raise KeyError(rest[0])
+
+    def _graph(self, method, graph, body):
+        if method == "GET":
+            return 200, graph.attrs
+        elif method in ("PUT", "PATCH"):
+            graph.attrs.update(body or {})
+            return 200, graph.attrs
+        elif method == "DELETE":
+            del self.graphs[graph.attrs["slug"]]
+            return 204, None
+        return 405, None
+
+    def _import(self, graph, kind, body):
+        if kind != "data":
+            graph.attrs.update(dict(body.get("graph", {}),
+                                    slug=graph.attrs["slug"]))
+            for mode in (NODE, RELATIONSHIP):
+                for _type in body.get("schema", {}).get(
+                        "{}Types".format(mode), []):
+                    _type = dict(_type)
+                    properties = _type.pop("properties", [])
+                    slug = graph.add_type(mode, _type)["slug"]
+                    graph.properties[mode][slug] = properties
+        if kind != "schema":
+            for key, mode in MODES.items():
+                for slug, elements in body.get(key, {}).items():
+                    graph.elements[mode].setdefault(slug, {}).update(
+                        (element["id"], element) for element in elements)
+        return 200, {"imported": True}
+
+    def _types(self, method, graph, mode, rest, params, body):
+        if not rest:
+            if method == "GET":
+                return 200, list(graph.types[mode].values())
+            elif isinstance(body, list):
+                return 201, [graph.add_type(mode, params) for params in body]
+            return 201, graph.add_type(mode, body)
+        slug = rest[0]
+        _type = graph.types[mode][slug]
+        elements = graph.elements[mode][slug]
+        if len(rest) == 1:
+            if method == "DELETE":
+                del graph.types[mode][slug]
+                return 204, None
+            return 200, _type
+        elif rest[1] == "schema":
+            properties = graph.properties[mode][slug]
+            if len(rest) == 3 and method == "POST":
+                properties.insert(0, {
+                    "label": body["key"],
+                    "description": body.get("description", ""),
+                    "type": body.get("datatype", "default"),
+                })
+            if len(rest) == 3:
+                return 200, {"properties": properties}
+            return 200, dict(_type, properties=properties)
+        elif rest[1] == "filter":
+            values = dict(params, **(body or {}))
+            limit, offset = values.pop("limit", None), values.pop("offset", 0)
+            matching = [element for element in elements.values()
+                        if all("{}".format(element["properties"].get(key))
+                               == "{}".format(value)
+                               for key, value in values.items())]
+            return 200, {"{}s".format(mode): self._page(matching, limit,
+                                                        offset)}
+        elif len(rest) == 2:
+            return self._elements(method, mode, elements, params, body)
+        return self._element(method, elements, int(rest[2]), body)
+
+    @staticmethod
+    def _page(elements, limit=None, offset=0):
+        offset = int(offset or 0)
+        if limit is None:
+            return elements[offset:]
+        return elements[offset:offset + int(limit)]
+
+    def _elements(self, method, mode, elements, params, body):
+        if method == "GET":
+            return 200, {
+                "{}s".format(mode): self._page(list(elements.values()),
+                                               params.get("limit"),
+                                               params.get("offset")),
+                "count": len(elements),
+            }
+        ids = []
+        for element in body:
+            # Elements are sent as properties, or inside 'properties'
+            if isinstance(element.get("properties"), dict):
+                element = element["properties"]
+            _id = self._next_id()
+            elements[_id] = {"id": _id, "properties": dict(element)}
+            ids.append(_id)
+        return 201, ids
+
+    @staticmethod
+    def _element(method, elements, _id, body):
+        element = elements[_id]
+        if method == "GET":
+            return 200, element
+        elif method == "PUT":
+            element["properties"] = dict(body.get("properties", body))
+        elif method == "PATCH":
+            element["properties"].update(body.get("properties", body))
+        elif method == "DELETE":
+            del elements[_id]
+            return 204, None
+        return 200, element
+
+
+class MockAdapter(BaseAdapter):
+    """Transport adapter answering the requests with a `MockServer`"""
+
+    def __init__(self, server):
+        super(MockAdapter, self).__init__()
+        self.server = server
+
+    def send(self, request, stream=False, **kwargs):
+        body = request.body
+        if body is not None and not isinstance(body, (bytes, type(""))):
+            # Streamed uploads, from file objects or generators
+            if hasattr(body, "read"):
+                body = body.read()
+            else:
+                body = b"".join(chunk if isinstance(chunk, bytes)
+                                else chunk.encode("utf-8") for chunk in body)
+        body = self._decompress(body, request.headers.get("Content-Encoding"))
+        status, data = self.server.handle(request.method, request.url, body)
+        content = b"" if data is None else json.dumps(data).encode("utf-8")
+        response = requests.Response()
+        response.status_code = status
+        response.reason = REASONS.get(status, "")
+        response.url = request.url
+        response.request = request
+        response.encoding = "utf-8"
+        response.headers = CaseInsensitiveDict({
+            "Content-Type": "application/json",
+            "Content-Length": "{}".format(len(content)),
+        })
+        if request.method == "GET" and status == 200:
+            etag = '"{}"'.format(hashlib.sha1(content).hexdigest())
+            response.headers["ETag"] = etag
+            if request.headers.get("If-None-Match") == etag:
+                response.status_code = 304
+                response.reason = REASONS[304]
+                content = b""
+        response.raw = io.BytesIO(content)
+        return response
+
+    @staticmethod
+    def _decompress(body, encoding):
+        if not body or not encoding:
+            return body
+        elif encoding == "gzip":
+            return zlib.decompress(body, 31)
+        elif encoding == "br":
+            return brotli.decompress(body)
+        elif encoding == "zstd":
+            # Streamed bodies are compressed without their size
+            return zstandard.ZstdDecompressor().decompressobj().decompress(
+                body)
+        raise ValueError("Unknown encoding '{}'".format(encoding))
+
+    def close(self):
+        pass
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+JSON serializers for slumber backed by the fastest library available:
+orjson, ujson or simdjson, falling back to the standard `json`
+"""
+from __future__ import absolute_import, unicode_literals
+import json
+
+import slumber
+from slumber import exceptions, serialize
+
+BACKENDS = ("orjson", "ujson", "simdjson", "json")  # By preference
+LAZY_THRESHOLD = 1024 * 1024  # Bytes from which responses are decoded lazily
+
+
+def _backend(name):
+    """Return the `loads` and `dumps` functions of the library `name`"""
+    if name == "orjson":
+        import orjson
+        return orjson.loads, orjson.dumps
+    elif name == "ujson":
+        import ujson
+        return ujson.loads, ujson.dumps
+    elif name == "simdjson":
+        import simdjson
+        return simdjson.loads, json.dumps
+    elif name == "json":
+        return json.loads, json.dumps
+    raise ValueError("Unknown JSON library '{}'".format(name))
+
+
+def available_backend():
+    """Return the name of the fastest JSON library installed"""
+    for name in BACKENDS:
+        try:
+            _backend(name)
+        except ImportError:
+            continue
+        return name
+
+
+class JsonSerializer(serialize.JsonSerializer):
+    """
+    JSON serializer using the library `backend`, or the fastest one
+    available. It decodes bytes with no intermediate text. If `lazy` and
+    simdjson is installed, responses of `lazy_threshold` bytes or more are
+    decoded lazily, as read-only views parsed as they are accessed
+    """
+
+    def __init__(self, backend=None, lazy=False,
+                 lazy_threshold=LAZY_THRESHOLD):
+        self.backend = backend or available_backend()
+        self._loads, self._dumps = _backend(self.backend)
+        self.lazy = False
+        if lazy:
+            try:
+                import simdjson
+                self._parser = simdjson.Parser
+                self.lazy = True
+            except ImportError:
+                pass
+        self.lazy_threshold = lazy_threshold
+
+    def __repr__(self):
+        return "<SylvaDB JsonSerializer with {} at {}>".format(
+            self.backend, hex(id(self)))
+
+    def loads(self, data):
+        if self.lazy and len(data) >= self.lazy_threshold:
+            if not isinstance(data, bytes):
+                data = data.encode("utf-8")
+            # A parser per document, since it is kept alive by its views
+            return self._parser().parse(data)
+        return self._loads(data)
+
+    def dumps(self, data):
+        return self._dumps(data)
+
+
+def materialize(value):
+    """Return a lazily decoded `value` as dictionaries and lists"""
+    if hasattr(value, "as_dict"):
+        return value.as_dict()
+    elif hasattr(value, "as_list"):
+        return value.as_list()
+    return value
+
+
+def get_serializer(serializer=None, lazy=False):
+    """
+    Return a slumber serializer for `serializer`: the fastest JSON library
+    available if `None`, the library of that name, or `serializer` itself
+    """
+    if isinstance(serializer, serialize.Serializer):
+        return serializer
+    if not isinstance(serializer, serialize.BaseSerializer):
+        serializer = JsonSerializer(serializer, lazy=lazy)
+    return serialize.Serializer(default=serializer.key,
+                                serializers=[serializer])
+
+
+class Resource(slumber.Resource):
+    """Resource decoding JSON responses straight from their bytes"""
+
+    def _try_to_serialize_response(self, resp):
+        if resp.status_code in [204, 205] or not resp.content:
+            return super(Resource, self)._try_to_serialize_response(resp)
+        content_type = resp.headers.get("content-type", "")
+        content_type = content_type.split(";")[0].strip()
+        serializer = self._store["serializer"]
+        try:
+            stype = serializer.get_serializer(content_type=content_type)
+        except exceptions.SerializerNotAvailable:
+            return resp.content
+        if isinstance(stype, JsonSerializer):
+            return stype.loads(resp.content)
+        return super(Resource, self)._try_to_serialize_response(resp)
+
+
+class SlumberAPI(slumber.API):
+    """Slumber API building `Resource` resources"""
+    resource_class = Resource
@@ -0,0 +1,418 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+import random
+import threading
+import time
+import uuid
+import zlib
+from contextlib import contextmanager
+from email.utils import mktime_tz, parsedate_tz
+try:
+    from http.cookiejar import DefaultCookiePolicy
+except ImportError:
+    from cookielib import DefaultCookiePolicy  # NOQA
+
+import requests
+from requests.adapters import HTTPAdapter
+try:
+    from urllib3.util.request import ACCEPT_ENCODING
+except ImportError:
+    ACCEPT_ENCODING = "gzip,deflate"
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+POOL_CONNECTIONS = 10  # Number of hosts to keep a connection pool for
+POOL_MAXSIZE = 10  # Number of connections kept alive per host
+POOL_BLOCK = False  # Wait for a free connection instead of opening more
+RETRIES = 3  # Number of retries of a failed request
+BACKOFF = 0.5  # Seconds to wait before the first retry, doubled every retry
+MAX_BACKOFF = 30  # Maximum seconds to wait between retries
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Methods that can be safely sent again, POST and PATCH need an idempotency key
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+COMPRESS_THRESHOLD = 1024  # Bytes from which request bodies are compressed
+COMPRESS_CHUNK_SIZE = 64 * 1024  # Bytes of streamed bodies read at a time
+# Default levels, favouring speed since bodies are compressed on every send
+COMPRESS_LEVELS = {"gzip": 6, "br": 4, "zstd": 3}
+
+_sessions = {}
+_lock = threading.Lock()
+
+
+class NotModified(Exception):
+    """Raised by a conditional request if the resource has not changed"""
+
+
+class RetryPolicy(object):
+    """
+    Policy to retry failed requests with exponential backoff and jitter.
+    Idempotent methods are retried on connection errors and on the
+    `statuses`; other methods only if sent with an idempotency key, which
+    is added to every POST and PATCH if `idempotency_keys` is set. Requests
+    rejected with 429 are always retried, waiting for their Retry-After
+    """
+
+    def __init__(self, retries=RETRIES, backoff=BACKOFF,
+                 max_backoff=MAX_BACKOFF, statuses=RETRY_STATUSES,
+                 methods=IDEMPOTENT_METHODS, idempotency_keys=False):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.statuses = statuses
+        self.methods = methods
+        self.idempotency_keys = idempotency_keys
+
+    def __repr__(self):
+        return "<SylvaDB RetryPolicy of {} retries at {}>".format(
+            self.retries, hex(id(self)))
+
+    def idempotent(self, method, headers):
+        """Check if a request can be sent again"""
+        return (method in self.methods
+                or IDEMPOTENCY_HEADER in (headers or {}))
+
+    def retry(self, attempt, method, headers, response=None):
+        """
+        Check if the request should be retried after the `attempt` that
+        got `response`, or a connection error if `None`
+        """
+        if attempt >= self.retries:
+            return False
+        if response is None:
+            return self.idempotent(method, headers)
+        if response.status_code == 429:
+            return True
+        return (response.status_code in self.statuses
+                and self.idempotent(method, headers))
+
+    @staticmethod
+    def retry_after(response):
+        """Return the seconds to wait set in Retry-After, if any"""
+        value = response is not None and response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(float(value), 0)
+        except ValueError:
+            date = parsedate_tz(value)
+            if date is None:
+                return None
+            return max(mktime_tz(date) - time.time(), 0)
+
+    def delay(self, attempt, response=None):
+        """Return the seconds to wait before the retry after `attempt`"""
+        retry_after = self.retry_after(response)
+        if retry_after is not None:
+            return retry_after
+        # Full jitter, so clients retrying at once do not stay in sync
+        return random.uniform(0, min(self.max_backoff,
+                                     self.backoff * 2 ** attempt))
+
+
+class RateLimiter(object):
+    """
+    Token bucket limiting the requests to `rate` per second, allowing
+    bursts of up to `burst` requests. It can be shared among APIs
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = burst if burst is not None else max(1, rate)
+        self._tokens = self.burst
+        self._updated = time.time()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return "<SylvaDB RateLimiter of {}/s at {}>".format(self.rate,
+                                                            hex(id(self)))
+
+    def _refill(self):
+        now = time.time()
+        self._tokens = min(self.burst, self._tokens
+                           + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Take a token, waiting until there is one available"""
+        with self._lock:
+            self._refill()
+            # The token is reserved, so waiting threads keep their turn
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Hold all the requests for `seconds`, as asked by the server"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, 0) - seconds * self.rate
+
+
+class Compression(object):
+    """
+    Compression of the requests and responses. Request bodies of
+    `threshold` bytes or more, and every streamed body, are compressed with
+    `encoding` (gzip, br or zstd), or sent as they are if `None`. Responses
+    are asked in the `accept` encodings, by default the ones that can be
+    decoded with the libraries installed
+    """
+
+    def __init__(self, encoding="gzip", threshold=COMPRESS_THRESHOLD,
+                 level=None, accept=ACCEPT_ENCODING):
+        if encoding not in (None, "gzip", "br", "zstd"):
+            raise ValueError("Unknown encoding '{}'".format(encoding))
+        if encoding == "br" and brotli is None:
+            raise ImportError("brotli is required for br compression")
+        if encoding == "zstd" and zstandard is None:
+            raise ImportError("zstandard is required for zstd compression")
+        self.encoding = encoding
+        self.threshold = threshold
+        self.level = level if level is not None else COMPRESS_LEVELS.get(
+            encoding)
+        self.accept = accept
+
+    def __repr__(self):
+        return "<SylvaDB Compression with {} at {}>".format(
+            self.encoding or "identity", hex(id(self)))
+
+    def _compressor(self):
+        """Return the functions to compress a chunk and to end the body"""
+        if self.encoding == "br":
+            compressor = brotli.Compressor(quality=self.level)
+            return compressor.process, compressor.finish
+        elif self.encoding == "zstd":
+            compressor = zstandard.ZstdCompressor(
+                level=self.level).compressobj()
+            return compressor.compress, compressor.flush
+        # A gzip header and trailer, as in Content-Encoding: gzip
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+        return compressor.compress, compressor.flush
+
+    def compress(self, data):
+        """Return `data` compressed"""
+        if not isinstance(data, bytes):
+            data = data.encode("utf-8")
+        compress, flush = self._compressor()
+        return compress(data) + flush()
+
+    def compress_stream(self, data):
+        """Compress a file object or iterable of chunks as it is read"""
+        compress, flush = self._compressor()
+        if hasattr(data, "read"):
+            read = data.read
+            data = iter(lambda: read(COMPRESS_CHUNK_SIZE) or b"", b"")
+        for chunk in data:
+            if not isinstance(chunk, bytes):
+                chunk = chunk.encode("utf-8")
+            chunk = compress(chunk)
+            if chunk:
+                yield chunk
+        yield flush()
+
+    def prepare(self, kwargs):
+        """Compress the body and set the headers of a request"""
+        headers = dict(kwargs.get("headers") or {})
+        if self.accept:
+            headers.setdefault("Accept-Encoding", self.accept)
+        data = kwargs.get("data")
+        if (self.encoding is not None and data is not None
+                and "Content-Encoding" not in headers):
+            if isinstance(data, (bytes, type(""))):
+                if len(data) >= self.threshold:
+                    kwargs["data"] = self.compress(data)
+                    headers["Content-Encoding"] = self.encoding
+            elif not isinstance(data, dict):
+                kwargs["data"] = self.compress_stream(data)
+                headers["Content-Encoding"] = self.encoding
+        kwargs["headers"] = headers
+
+
+def new_session(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE,
+                pool_block=POOL_BLOCK, max_retries=0):
+    """Create a `requests` session with keep-alive connection pools"""
+    session = requests.Session()
+    # The session is shared among tokens, so cookies are never stored
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    adapter = HTTPAdapter(pool_connections=pool_connections,
+                          pool_maxsize=pool_maxsize, pool_block=pool_block,
+                          max_retries=max_retries)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE,
+                pool_block=POOL_BLOCK, max_retries=0):
+    """
+    Return the `requests` session shared by every API created with the same
+    pool configuration, creating it the first time
+    """
+    key = (pool_connections, pool_maxsize, pool_block, max_retries)
+    with _lock:
+        if key not in _sessions:
+            _sessions[key] = new_session(pool_connections, pool_maxsize,
+                                         pool_block, max_retries)
+        return _sessions[key]
+
+
+class Session(object):
+    """
+    Session used by an API. It keeps its own authentication while sending
+    the requests through a shared `requests` session, so APIs for different
+    tokens and graphs reuse the same connections
+    """
+
+    def __init__(self, session=None, auth=None, retry=None,
+                 rate_limiter=None, metrics=None, compression=None):
+        self._session = session if session is not None else get_session()
+        self.auth = auth  # Set by slumber
+        self.retry = retry
+        self.rate_limiter = rate_limiter
+        self.metrics = metrics
+        self.compression = compression
+        self.hooks = {"before": [], "after": []}
+        self._local = threading.local()
+
+    def __repr__(self):
+        return "<SylvaDB Session at {}>".format(hex(id(self)))
+
+    @contextmanager
+    def conditional(self, enabled=True, validators=None):
+        """
+        Keep in the dictionary `validators` the ETag or Last-Modified of the
+        responses to the GET requests in the context, by resource. If
+        `enabled`, the requests are made conditional on the ones kept, and
+        if a resource has not changed, `NotModified` is raised
+        """
+        previous = getattr(self._local, "conditional", None)
+        self._local.conditional = (
+            enabled, validators if validators is not None else {})
+        try:
+            yield
+        finally:
+            self._local.conditional = previous
+
+    @contextmanager
+    def endpoint(self, name):
+        """Name the endpoint of the requests in the context"""
+        previous = getattr(self._local, "endpoint", None)
+        self._local.endpoint = name
+        try:
+            yield
+        finally:
+            self._local.endpoint = previous
+
+    def request(self, method, url, **kwargs):
+        """Send a request using the shared session"""
+        kwargs.setdefault("auth", self.auth)
+        conditional = getattr(self._local, "conditional", None)
+        if method != "GET" or conditional is None:
+            return self._send(method, url, kwargs)
+        enabled, stored = conditional
+        key = (url, repr(sorted((kwargs.get("params") or {}).items())))
+        if enabled and key in stored:
+            headers = dict(kwargs.get("headers") or {})
+            headers.update(stored[key])
+            kwargs["headers"] = headers
+        response = self._send(method, url, kwargs)
+        if enabled and response.status_code == 304:
+            raise NotModified(url)
+        if response.status_code == 200:
+            validators = {}
+            if response.headers.get("ETag"):
+                validators["If-None-Match"] = response.headers["ETag"]
+            if response.headers.get("Last-Modified"):
+                validators["If-Modified-Since"] = (
+                    response.headers["Last-Modified"])
+            if validators:
+                stored[key] = validators
+            else:
+                stored.pop(key, None)
+        return response
+
+    def _send(self, method, url, kwargs):
+        """Send a request, retrying it as set by the retry policy"""
+        retry = self.retry
+        if retry is not None and retry.idempotency_keys and method in (
+                "POST", "PATCH"):
+            # The same key is kept in the retries
+            headers = dict(kwargs.get("headers") or {})
+            headers.setdefault(IDEMPOTENCY_HEADER, str(uuid.uuid4()))
+            kwargs["headers"] = headers
+        if self.compression is not None:
+            self.compression.prepare(kwargs)
+        data = kwargs.get("data")
+        if data is not None and not isinstance(data, (bytes, type(""))):
+            # Streamed bodies cannot be sent again
+            retry = None
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            try:
+                response = self._attempt(method, url, kwargs, attempt)
+            except (requests.ConnectionError, requests.Timeout):
+                if retry is None or not retry.retry(
+                        attempt, method, kwargs.get("headers")):
+                    raise
+                response = None
+            else:
+                if retry is None or not retry.retry(
+                        attempt, method, kwargs.get("headers"), response):
+                    return response
+            delay = retry.delay(attempt, response)
+            if response is not None:
+                response.close()
+            if (response is not None and response.status_code == 429
+                    and self.rate_limiter is not None):
+                self.rate_limiter.pause(delay)
+            else:
+                time.sleep(delay)
+            attempt += 1
+
+    def _attempt(self, method, url, kwargs, attempt):
+        """Send a request once, calling the hooks and recording metrics"""
+        request = {
+            "endpoint": (getattr(self._local, "endpoint", None)
+                         or method.lower()),
+            "method": method,
+            "url": url,
+            "attempt": attempt,
+        }
+        for hook in self.hooks["before"]:
+            hook(request)
+        response = None
+        start = time.time()
+        try:
+            response = self._session.request(method, url, **kwargs)
+            return response
+        except Exception as e:
+            request["error"] = e
+            raise
+        finally:
+            seconds = time.time() - start
+            if self.metrics is not None:
+                data = kwargs.get("data")
+                sent = (len(data) if isinstance(data, (bytes, type("")))
+                        else 0)
+                received = 0
+                if response is not None:
+                    if kwargs.get("stream"):
+                        received = int(
+                            response.headers.get("Content-Length") or 0)
+                    else:
+                        received = len(response.content or b"")
+                self.metrics.record(
+                    request["endpoint"],
+                    response.status_code if response is not None else None,
+                    seconds, sent, received)
+            for hook in self.hooks["after"]:
+                hook(request, response, seconds)
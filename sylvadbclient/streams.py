@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming of graph exports to files, optionally compressed with gzip or
+zstd, and incremental reading of the exported nodes and relationships
+"""
+from __future__ import absolute_import, unicode_literals
+import codecs
+import gzip
+import json
+from contextlib import contextmanager
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+STREAM_CHUNK_SIZE = 64 * 1024  # Bytes read or written at a time
+# Compressions inferred from the file extensions
+EXTENSIONS = {
+    ".gz": "gzip",
+    ".zst": "zstd",
+}
+# Keys of the exports holding nodes and relationships
+MODES = {
+    "nodes": "node",
+    "relationships": "relationship",
+}
+WHITESPACE = " \t\n\r"
+
+
+def _compression(path_or_fileobj, compression=None):
+    """Return the compression to use, inferred from the path if not set"""
+    if compression is None and not hasattr(path_or_fileobj, "read"):
+        for extension, _compression in EXTENSIONS.items():
+            if path_or_fileobj.endswith(extension):
+                return _compression
+    if compression not in (None, "gzip", "zstd"):
+        raise ValueError("Unknown compression '{}'".format(compression))
+    return compression
+
+
+@contextmanager
+def open_stream(path_or_fileobj, mode="rb", compression=None):
+    """
+    Open a path or wrap a binary file object for reading or writing in
+    `mode`, with `compression` ('gzip' or 'zstd') if set or inferred from
+    the extension of the path. File objects passed in are not closed
+    """
+    compression = _compression(path_or_fileobj, compression)
+    if compression == "zstd" and zstandard is None:
+        raise ImportError("zstandard is required for zstd compression")
+    if hasattr(path_or_fileobj, "read") or hasattr(path_or_fileobj, "write"):
+        fileobj, opened = path_or_fileobj, False
+    else:
+        fileobj, opened = open(path_or_fileobj, mode), True
+    stream = fileobj
+    try:
+        if compression == "gzip":
+            stream = gzip.GzipFile(fileobj=fileobj, mode=mode)
+        elif compression == "zstd" and "w" in mode:
+            stream = zstandard.ZstdCompressor().stream_writer(
+                fileobj, closefd=False)
+        elif compression == "zstd":
+            stream = zstandard.ZstdDecompressor().stream_reader(
+                fileobj, closefd=False)
+        yield stream
+    finally:
+        try:
+            if stream is not fileobj:
+                stream.close()
+        finally:
+            if opened:
+                fileobj.close()
+
+
+def read_chunks(stream, chunk_size=STREAM_CHUNK_SIZE):
+    """Return a generator over the chunks of `chunk_size` bytes of `stream`"""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+class ExportReader(object):
+    """
+    Incremental reader of a JSON export from a binary file object. Only
+    one node or relationship is decoded and held in memory at a time
+    """
+
+    def __init__(self, fileobj, chunk_size=STREAM_CHUNK_SIZE):
+        self._fileobj = fileobj
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        """Read the next chunk into the buffer, `False` if at the end"""
+        if self._eof:
+            return False
+        chunk = self._fileobj.read(self._chunk_size)
+        self._eof = not chunk
+        # Consumed text is dropped from the buffer
+        self._buffer = self._buffer[self._pos:] + self._text.decode(
+            chunk, final=self._eof)
+        self._pos = 0
+        return bool(chunk)
+
+    def _peek(self):
+        """Return the next character that is not whitespace"""
+        while True:
+            while (self._pos < len(self._buffer)
+                   and self._buffer[self._pos] in WHITESPACE):
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of the export")
+
+    def _expect(self, characters):
+        """Consume the next character, that must be in `characters`"""
+        character = self._peek()
+        if character not in characters:
+            raise ValueError("Expected '{}' at '{}' in the export".format(
+                characters, character))
+        self._pos += 1
+        return character
+
+    def _value(self):
+        """Decode the next value, reading more chunks while incomplete"""
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except ValueError:
+                if not self._fill():
+                    raise
+                continue
+            # Numbers and literals might go on in the next chunk
+            if end < len(self._buffer) or self._eof:
+                self._pos = end
+                return value
+            self._fill()
+
+    def _items(self, mode, slug=None):
+        """Yield the elements of the array or the arrays by type slug"""
+        if self._peek() == "[":
+            self._pos += 1
+            if self._peek() == "]":
+                self._pos += 1
+                return
+            while True:
+                yield mode, slug, self._value()
+                if self._expect(",]") == "]":
+                    return
+        elif self._peek() == "{" and slug is None:
+            for key in self._keys():
+                for item in self._items(mode, key):
+                    yield item
+        else:
+            self._value()
+
+    def _keys(self):
+        """Yield the keys of the next object, leaving the values unread"""
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self._value()
+            self._expect(":")
+            yield key
+            if self._expect(",}") == "}":
+                return
+
+    def _walk(self):
+        """Yield the elements found in the next value"""
+        if self._peek() != "{":
+            self._value()
+            return
+        for key in self._keys():
+            if key in MODES:
+                for item in self._items(MODES[key]):
+                    yield item
+            else:
+                for item in self._walk():
+                    yield item
+
+    def __iter__(self):
+        return self._walk()
+
+
+def read_export(path_or_fileobj, compression=None,
+                chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Return a generator over the nodes and relationships of an export file,
+    as tuples of the mode ('node' or 'relationship'), the type slug if they
+    are grouped by type, and the element
+    """
+    with open_stream(path_or_fileobj, "rb", compression) as stream:
+        for item in ExportReader(stream, chunk_size):
+            yield item
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+import json
+import unittest
+try:
+    import asyncio
+    from sylvadbclient.aio import (
+        AsyncAPI, AsyncDataCollection, AsyncGraph, aiohttp,
+    )
+except (ImportError, SyntaxError):
+    AsyncDataCollection = aiohttp = None
+
+
+class FakeAsyncAPI(object):
+    """API whose methods return coroutines, recording the calls awaited"""
+
+    def __init__(self):
+        self.calls = []
+
+    def _call(self, name, *args):
+        self.calls.append((name, ) + args)
+        return asyncio.sleep(0, result=None)
+
+    def patch_node(self, slug, _id, params=None):
+        return self._call("patch_node", slug, _id, params)
+
+    def delete_node(self, slug, _id):
+        return self._call("delete_node", slug, _id)
+
+    def get_nodes(self, slug, limit=None, offset=None):
+        # The paging is ignored, so the same page is always sent
+        self.calls.append(("get_nodes", slug, limit, offset))
+        return asyncio.sleep(0, result={"nodes": [
+            {"id": _id, "properties": {}} for _id in (1, 2)]})
+
+    def filter_nodes(self, slug, limit=None, offset=None, params=None):
+        return self.get_nodes(slug, limit, offset)
+
+
+class FakeResponse(object):
+    """aiohttp response with a JSON `body`"""
+
+    def __init__(self, body, status=200):
+        self.status = status
+        self.headers = {"content-type": "application/json"}
+        self._content = json.dumps(body).encode("utf-8")
+
+    def __aenter__(self):
+        return asyncio.sleep(0, result=self)
+
+    def __aexit__(self, *exc_info):
+        return asyncio.sleep(0, result=False)
+
+    def read(self):
+        return asyncio.sleep(0, result=self._content)
+
+
+class FakeClientSession(object):
+    """aiohttp session answering every request with `body`"""
+
+    def __init__(self, body):
+        self.body = body
+        self.requests = []
+
+    def request(self, method, url, **kwargs):
+        self.requests.append((method, url, kwargs))
+        return FakeResponse(self.body)
+
+
+@unittest.skipIf(AsyncDataCollection is None, "asyncio is not available")
+class AsyncDataCollectionTestSuite(unittest.TestCase):
+
+    def setUp(self):
+        self.api = FakeAsyncAPI()
+        self.nodes = AsyncDataCollection(self.api, "node", "node")
+        self.nodes._data = [self.nodes._dehydrate(
+            {"id": _id, "properties": {"p0": _id}}) for _id in (1, 2, 3)]
+
+    def run_async(self, coroutine):
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(coroutine)
+        finally:
+            loop.close()
+
+    def collect(self, generator):
+        loop = asyncio.new_event_loop()
+        elements = []
+        try:
+            while True:
+                try:
+                    elements.append(
+                        loop.run_until_complete(generator.__anext__()))
+                except StopAsyncIteration:
+                    return elements
+        finally:
+            loop.close()
+
+    def test_stops_paging_on_a_repeated_page(self):
+        nodes = AsyncDataCollection(self.api, "node", "node", page_size=2)
+        self.assertEqual(len(self.collect(nodes.iter())), 2)
+        self.assertEqual(nodes._total, 2)
+        self.assertEqual(len(self.collect(nodes.filter(p0=1))), 2)
+        self.assertEqual(len(self.api.calls), 4)
+
+    def test_can_update_many(self):
+        stats = self.run_async(self.nodes.update_many({1: {"p0": 10}}))
+        self.assertEqual(stats["updated"], 1)
+        self.assertEqual(self.api.calls,
+                         [("patch_node", "node", 1, {"properties": {
+                             "p0": 10}})])
+        self.assertEqual(self.nodes.get_by_id(1)["properties"]["p0"], 10)
+
+    def test_can_delete_many(self):
+        stats = self.run_async(self.nodes.delete_many([1, 2]))
+        self.assertEqual(stats["deleted"], 2)
+        self.assertEqual(len(self.api.calls), 2)
+        self.assertEqual([element["id"] for element in self.nodes.data], [3])
+
+    @unittest.skipIf(aiohttp is None, "aiohttp is not installed")
+    def test_unsupported_methods_raise(self):
+        api = AsyncAPI("token", graph_slug="graph-1")
+        self.assertRaises(NotImplementedError, api.export_graph_stream)
+        self.assertRaises(NotImplementedError, api.export_data_stream)
+        graph = AsyncGraph("graph-1", auth="token")
+        self.assertRaises(NotImplementedError, graph.export_to, "graph.json")
+        self.assertRaises(NotImplementedError, graph.batch)
+
+    @unittest.skipIf(aiohttp is None, "aiohttp is not installed")
+    def test_can_import(self):
+        session = FakeClientSession({"imported": True})
+        api = AsyncAPI("token", graph_slug="graph-1", session=session)
+        for data in ({"graph": {}}, b'{"graph": {}}'):
+            response = self.run_async(api.import_graph(data))
+            self.assertEqual(response, {"imported": True})
+        self.run_async(api.import_data(iter([b'{"nodes": ', b"{}}"])))
+        method, url, _ = session.requests[0]
+        self.assertEqual(method, "PUT")
+        self.assertTrue(url.endswith("/graphs/graph-1/import/graph/"))
+        self.assertTrue(session.requests[-1][1].endswith(
+            "/graphs/graph-1/import/data/"))
+        bodies = [kwargs["data"] for _, _, kwargs in session.requests]
+        self.assertEqual(json.loads(bodies[0]), {"graph": {}})
+        self.assertEqual(bodies[1], b'{"graph": {}}')
+        self.assertTrue(hasattr(bodies[2], "__aiter__"))
+        self.assertEqual(api.metrics.snapshot()["import_graph"]["requests"],
+                         2)
+
+    @unittest.skipIf(aiohttp is None, "aiohttp is not installed")
+    def test_can_record_metrics_and_call_hooks(self):
+        api = AsyncAPI("token", graph_slug="graph-1", cache=False,
+                       session=FakeClientSession({"name": "graph-1"}))
+        requests = []
+        api.register_hook("before", requests.append)
+        graph = self.run_async(api.get_graph())
+        self.assertEqual(graph["name"], "graph-1")
+        self.assertEqual([request["endpoint"] for request in requests],
+                         ["get_graph"])
+        metrics = api.metrics.snapshot()["get_graph"]
+        self.assertEqual(metrics["requests"], 1)
+        self.assertEqual(metrics["statuses"], {200: 1})
+        self.assertRaises(NotImplementedError, api.conditional)
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+import unittest
+
+from sylvadbclient import API, Cache, DiskCache
+from sylvadbclient.mock import MockServer
+
+
+class CacheTestSuite(unittest.TestCase):
+
+    def test_only_caches_methods_with_ttl(self):
+        cache = Cache(ttls={"get_nodetypes": 60})
+        cache.set(("graph-1", "get_nodetypes"), [1])
+        cache.set(("graph-1", "get_nodes"), [2])
+        self.assertEqual(cache.get(("graph-1", "get_nodetypes")), [1])
+        self.assertEqual(cache.get(("graph-1", "get_nodes")), None)
+
+    def test_returns_copies(self):
+        cache = Cache(ttls={"get_nodetypes": 60})
+        cache.set(("graph-1", "get_nodetypes"), [{"name": "Node"}])
+        cache.get(("graph-1", "get_nodetypes"))[0]["name"] = "Other"
+        self.assertEqual(cache.get(("graph-1", "get_nodetypes")),
+                         [{"name": "Node"}])
+
+    def test_entries_expire(self):
+        cache = Cache(ttls={"get_nodetypes": -1})
+        cache.set(("graph-1", "get_nodetypes"), [1])
+        self.assertEqual(cache.get(("graph-1", "get_nodetypes")), None)
+        self.assertEqual(len(cache), 0)
+
+    def test_evicts_least_recently_used(self):
+        cache = Cache(maxsize=2, ttls={"get_nodetypes": 60})
+        for slug in ("graph-1", "graph-2"):
+            cache.set((slug, "get_nodetypes"), [slug])
+        cache.get(("graph-1", "get_nodetypes"))
+        cache.set(("graph-3", "get_nodetypes"), ["graph-3"])
+        self.assertEqual(cache.get(("graph-2", "get_nodetypes")), None)
+        self.assertEqual(cache.get(("graph-1", "get_nodetypes")),
+                         ["graph-1"])
+
+    def test_invalidates_graph_and_listings(self):
+        cache = Cache(ttls={"get_nodetypes": 60, "get_graphs": 60})
+        cache.set(("graph-1", "get_nodetypes"), [1])
+        cache.set(("graph-2", "get_nodetypes"), [2])
+        cache.set((None, "get_graphs"), [3])
+        cache.invalidate("graph-1")
+        self.assertEqual(cache.get(("graph-1", "get_nodetypes")), None)
+        self.assertEqual(cache.get((None, "get_graphs")), None)
+        self.assertEqual(cache.get(("graph-2", "get_nodetypes")), [2])
+
+
+class DiskCacheTestSuite(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "cache")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_keeps_entries_between_instances(self):
+        cache = DiskCache(self.path, ttls={"get_nodetypes": 60})
+        cache.set(("graph-1", "get_nodetypes"), [1])
+        cache.close()
+        cache = DiskCache(self.path, ttls={"get_nodetypes": 60})
+        self.assertEqual(cache.get(("graph-1", "get_nodetypes")), [1])
+        cache.invalidate("graph-1")
+        self.assertEqual(cache.get(("graph-1", "get_nodetypes")), None)
+        cache.close()
+
+    def test_invalidates_only_the_graph_entries(self):
+        cache = DiskCache(self.path,
+                          ttls={"get_nodetypes": 60, "get_graphs": 60})
+        cache.set(("graph-1", "get_nodetypes"), [1])
+        cache.set(("graph-2", "get_nodetypes"), [2])
+        cache.set((None, "get_graphs"), [3])
+        cache.invalidate("graph-1")
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.get(("graph-2", "get_nodetypes")), [2])
+        cache.close()
+        # Graphs without entries are invalidated without reading the disk
+        cache.invalidate("graph-3")
+
+    def test_removes_entries_closer_to_expire(self):
+        cache = DiskCache(self.path, maxsize=1,
+                          ttls={"get_nodetypes": 60, "get_graphs": 120})
+        cache.set(("graph-1", "get_nodetypes"), [1])
+        cache.set((None, "get_graphs"), [2])
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.get((None, "get_graphs")), [2])
+        cache.close()
+
+
+class CachedAPITestSuite(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockServer()
+        self.server.populate("graph-1", nodes=1)
+        self.session = self.server.session()
+        self.api = API("token", graph_slug="graph-1", cache=Cache(),
+                       session=self.session)
+
+    def test_caches_responses(self):
+        self.api.get_nodetypes()
+        requests = self.server.requests
+        self.assertEqual(len(self.api.get_nodetypes()), 1)
+        self.assertEqual(self.server.requests, requests)
+
+    def test_changes_invalidate_the_graph(self):
+        self.api.get_nodetypes()
+        self.api.post_nodetypes({"name": "Person"})
+        requests = self.server.requests
+        self.assertEqual(len(self.api.get_nodetypes()), 2)
+        self.assertEqual(self.server.requests, requests + 1)
+
+    def test_caches_per_token(self):
+        self.api.get_nodetypes()
+        requests = self.server.requests
+        api = API("other", graph_slug="graph-1", cache=self.api._cache,
+                  session=self.session)
+        api.get_nodetypes()
+        self.assertEqual(self.server.requests, requests + 1)
+
+    def test_can_disable_the_cache(self):
+        api = API("token", graph_slug="graph-1", cache=False,
+                  session=self.server.session())
+        api.get_nodetypes()
+        requests = self.server.requests
+        api.get_nodetypes()
+        self.assertEqual(self.server.requests, requests + 1)
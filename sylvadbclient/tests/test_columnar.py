@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from sylvadbclient import Graph
+from sylvadbclient.columnar import ColumnarStore, numpy, pandas, pyarrow
+from sylvadbclient.mock import MockServer
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class ColumnarExportTestSuite(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockServer()
+        graph = self.server.populate("graph-1", nodes=10)
+        # A node without the number 'p0'
+        graph.elements["node"]["node"][100] = {
+            "id": 100, "properties": {"p1": "missing"}}
+        graph.add_type("node", {"name": "Empty"})
+        self.graph = Graph("graph-1", auth="token", columnar=True,
+                           session=self.server.session())
+
+    def test_can_export_streamed_nodes_to_numpy(self):
+        nodes = self.graph.nodes["Node"]
+        arrays = nodes.to_numpy(page_size=4)
+        self.assertIsNone(nodes._data)
+        self.assertEqual(arrays["id"].dtype.name, "int64")
+        self.assertEqual(list(arrays["id"][:3]), [1, 2, 3])
+        self.assertIsInstance(arrays["p0"], numpy.ma.MaskedArray)
+        self.assertEqual(arrays["p0"].dtype.name, "int64")
+        self.assertEqual(arrays["p0"].count(), 10)
+        self.assertTrue(arrays["p0"].mask[-1])
+        self.assertEqual(arrays["p1"].dtype, object)
+        self.assertEqual(arrays["p1"][-1], "missing")
+
+    def test_can_export_pulled_nodes_to_numpy(self):
+        nodes = self.graph.nodes["Node"]
+        nodes.pull()
+        self.assertIsInstance(nodes.data, ColumnarStore)
+        nodes[0]["properties"]["p0"] = 99
+        arrays = nodes.to_numpy()
+        self.assertEqual(arrays["p0"][0], 99)
+        self.assertEqual(len(arrays["id"]), 11)
+
+    @unittest.skipIf(pandas is None, "pandas is not installed")
+    def test_can_export_to_pandas(self):
+        for pull in (False, True):
+            nodes = self.graph.nodes["Node"]
+            if pull:
+                nodes.pull()
+            frame = nodes.to_pandas(page_size=4)
+            self.assertEqual(frame.index.name, "id")
+            self.assertEqual(len(frame), 11)
+            self.assertEqual(frame["p0"].dtype.name, "Int64")
+            self.assertTrue(pandas.isna(frame["p0"].loc[100]))
+            self.assertEqual(frame["p0"].loc[3], 2)
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_can_export_to_arrow(self):
+        for pull in (False, True):
+            nodes = self.graph.nodes["Node"]
+            if pull:
+                nodes.pull()
+            table = nodes.to_arrow(page_size=4)
+            self.assertEqual(table.num_rows, 11)
+            self.assertEqual(str(table.schema.field("p0").type), "int64")
+            self.assertEqual(table.column("p0").null_count, 1)
+            self.assertEqual(table.column("p1").to_pylist()[-1], "missing")
+
+    def test_can_export_empty_types(self):
+        nodes = self.graph.nodes["empty"]
+        arrays = nodes.to_numpy()
+        self.assertEqual(list(arrays), ["id"])
+        self.assertEqual(len(arrays["id"]), 0)
+        if pandas is not None:
+            self.assertEqual(len(nodes.to_pandas()), 0)
+        if pyarrow is not None:
+            self.assertEqual(nodes.to_arrow().num_rows, 0)
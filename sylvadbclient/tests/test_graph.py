@@ -75,10 +75,21 @@ class GraphTestSuite(unittest.TestCase):
         datatype = self.graph.nodes.types[0]
         self.assertTrue([n for n in self.graph.nodes[datatype]] is not None)
 
+    def test_can_slice_nodes(self):
+        datatype = self.graph.nodes.types[0]
+        nodes = self.graph.nodes[datatype]
+        self.assertTrue(nodes[0:2] == nodes.all()[0:2])
+
     def test_can_count_nodes(self):
         datatype = self.graph.nodes.types[0]
         self.assertTrue(len(self.graph.nodes[datatype]) > 0)
 
+    def test_can_count_nodes_without_pulling(self):
+        datatype = self.graph.nodes.types[0]
+        nodes = self.graph.nodes[datatype]
+        self.assertTrue(nodes.count() > 0)
+        self.assertTrue(nodes._data is None)
+
     def test_can_get_rel_types(self):
         self.assertTrue(self.graph.rels.types is not None)
 
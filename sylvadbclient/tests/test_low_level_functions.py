@@ -737,6 +737,75 @@ class GraphTestSuite(unittest.TestCase):
         self.assertTrue(len(result) == 1)
         self.api.delete_graph()
 
+    def test_filter_relationships(self):
+        name = "test_name"
+        description = "description_name"
+        create_and_use_graph(self, name, description)
+        # The source nodetype
+        nodetype_name = "nodetype_name_source"
+        nodetype_description = "nodetype_description"
+        result = create_nodetype(self, nodetype_name, nodetype_description)
+        source_slug = result['slug']
+        prop_name = "property_name"
+        prop_description = "property_description"
+        prop_datatype = "default"
+        create_nodetype_properties(self, source_slug, prop_name,
+                                   prop_description, prop_datatype)
+        # The target nodetype
+        nodetype_name = "nodetype_name_target"
+        nodetype_description = "nodetype_description"
+        result = create_nodetype(self, nodetype_name, nodetype_description)
+        target_slug = result['slug']
+        prop_name = "property_name"
+        prop_description = "property_description"
+        prop_datatype = "default"
+        create_nodetype_properties(self, target_slug, prop_name,
+                                   prop_description, prop_datatype)
+        relationshiptype_name = "relationshiptype_name"
+        result = create_relationshiptype(self, relationshiptype_name,
+                                         source_slug, target_slug)
+        relationshiptype_slug = result['slug']
+        self.assertTrue(result['name'] == relationshiptype_name)
+        prop_name = "property_name"
+        prop_description = "property_description"
+        prop_datatype = "default"
+        create_relationshiptype_properties(
+            self, relationshiptype_slug, prop_name, prop_description,
+            prop_datatype)
+        # We create nodes for source and target
+        node_name_source = "node_name_source"
+        node_data_source = {prop_name: node_name_source}
+        nodes_list = []
+        nodes_list.append(node_data_source)
+        result = self.api.post_nodes(source_slug, nodes_list)
+        self.assertTrue(len(result) == 1)
+        node_source_id = result[0]
+        node_name_target = "node_name_target"
+        node_data_target = {prop_name: node_name_target}
+        nodes_list = []
+        nodes_list.append(node_data_target)
+        result = self.api.post_nodes(target_slug, nodes_list)
+        self.assertTrue(len(result) == 1)
+        node_target_id = result[0]
+        # We create the relationship
+        relationship_name = "relationshipName"
+        relationship_data = {prop_name: relationship_name,
+                             'source_id': node_source_id,
+                             'target_id': node_target_id}
+        relationships_list = []
+        relationships_list.append(relationship_data)
+        result = self.api.post_relationships(
+            relationshiptype_slug, relationships_list)
+        self.assertTrue(len(result) == 1)
+        filtering_params = {prop_name: relationship_name}
+        result = self.api.filter_relationships(
+            relationshiptype_slug, params=filtering_params)
+        self.assertTrue(len(result['relationships']) == 1)
+        result = self.api.filter_relationships_get(
+            relationshiptype_slug, params=filtering_params)
+        self.assertTrue(len(result['relationships']) == 1)
+        self.api.delete_graph()
+
     def test_get_relationship(self):
         name = "test_name"
         description = "description_name"
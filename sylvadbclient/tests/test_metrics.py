@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from slumber import exceptions
+
+from sylvadbclient import API, Metrics
+from sylvadbclient.mock import MockServer
+
+
+class MetricsTestSuite(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockServer()
+        self.server.populate("graph-1", nodes=5)
+        self.api = API("token", graph_slug="graph-1", cache=False,
+                       session=self.server.session())
+
+    def test_records_requests_by_endpoint(self):
+        self.api.get_graph()
+        self.api.get_graph()
+        self.api.get_nodetypes()
+        self.assertRaises(exceptions.HttpNotFoundError,
+                          self.api.get_nodetype, "missing")
+        metrics = self.api.metrics.snapshot()
+        self.assertEqual(metrics["get_graph"]["requests"], 2)
+        self.assertEqual(metrics["get_graph"]["statuses"], {200: 2})
+        self.assertEqual(metrics["get_graph"]["errors"], 0)
+        self.assertTrue(metrics["get_graph"]["bytes_received"] > 0)
+        self.assertEqual(metrics["get_graph"]["latency"]["+Inf"], 2)
+        self.assertEqual(metrics["get_nodetypes"]["requests"], 1)
+        self.assertEqual(metrics["get_nodetype"]["statuses"], {404: 1})
+        self.assertEqual(metrics["get_nodetype"]["errors"], 1)
+
+    def test_records_bytes_sent(self):
+        self.api.post_nodetypes({"name": "Person"})
+        metrics = self.api.metrics.snapshot()["post_nodetypes"]
+        self.assertTrue(metrics["bytes_sent"] > 0)
+        self.assertEqual(metrics["statuses"], {201: 1})
+
+    def test_can_share_and_disable_metrics(self):
+        metrics = Metrics()
+        api = API("token", graph_slug="graph-1", cache=False,
+                  metrics=metrics, session=self.server.session())
+        api.get_graph()
+        self.api.get_graph()
+        self.assertEqual(metrics.snapshot()["get_graph"]["requests"], 1)
+        api = API("token", graph_slug="graph-1", metrics=False,
+                  session=self.server.session())
+        self.assertIsNone(api.metrics)
+        api.get_graph()
+
+    def test_can_export_to_prometheus(self):
+        self.api.get_graph()
+        self.assertRaises(exceptions.HttpNotFoundError,
+                          self.api.get_nodetype, "missing")
+        lines = self.api.metrics.to_prometheus().splitlines()
+        self.assertIn("# TYPE sylvadb_requests_total counter", lines)
+        self.assertIn('sylvadb_requests_total{endpoint="get_graph",'
+                      'status="200"} 1', lines)
+        self.assertIn('sylvadb_requests_total{endpoint="get_nodetype",'
+                      'status="404"} 1', lines)
+        self.assertIn('sylvadb_request_duration_seconds_bucket{'
+                      'endpoint="get_graph",le="+Inf"} 1', lines)
+        self.assertIn('sylvadb_request_duration_seconds_count{'
+                      'endpoint="get_graph"} 1', lines)
+        self.assertTrue(any(line.startswith(
+            'sylvadb_bytes_received_total{endpoint="get_graph"}')
+            for line in lines))
+        self.api.metrics.reset()
+        self.assertEqual(self.api.metrics.snapshot(), {})
+
+    def test_calls_registered_hooks(self):
+        calls = []
+
+        def before(request):
+            calls.append(("before", request["endpoint"], request["method"]))
+
+        def after(request, response, seconds):
+            calls.append(("after", request["endpoint"],
+                          response.status_code))
+
+        self.api.register_hook("before", before)
+        self.api.register_hook("after", after)
+        self.api.get_graph()
+        self.assertEqual(calls, [("before", "get_graph", "GET"),
+                                 ("after", "get_graph", 200)])
+        self.assertTrue(self.api.deregister_hook("before", before))
+        self.assertTrue(self.api.deregister_hook("after", after))
+        self.assertFalse(self.api.deregister_hook("after", after))
+        self.api.get_graph()
+        self.assertEqual(len(calls), 2)
@@ -0,0 +1,360 @@
+# -*- coding: utf-8 -*-
+import io
+import time
+import unittest
+
+from sylvadbclient import Compression, Graph, PushError, read_export
+from sylvadbclient import benchmarks
+from sylvadbclient.api import NODE, DataCollection, Index, Properties
+from sylvadbclient.mock import MockServer
+
+
+class UnpagedMockServer(MockServer):
+    """Server ignoring the paging and not sending the count of elements"""
+
+    @staticmethod
+    def _page(elements, limit=None, offset=0):
+        return elements
+
+    def _elements(self, method, mode, elements, params, body):
+        status, data = super(UnpagedMockServer, self)._elements(
+            method, mode, elements, params, body)
+        if method == "GET":
+            data.pop("count")
+        return status, data
+
+
+class FailingMockServer(MockServer):
+    """
+    Server failing the posts of elements with 'fail' in 'p1', and delaying
+    the ones with 'slow', so their chunk finishes last
+    """
+
+    def _elements(self, method, mode, elements, params, body):
+        if method == "POST":
+            values = [element.get("properties", element).get("p1")
+                      for element in body]
+            if "fail" in values:
+                return 500, {"detail": "failed"}
+            if "slow" in values:
+                time.sleep(0.05)
+        return super(FailingMockServer, self)._elements(
+            method, mode, elements, params, body)
+
+
+class MockServerTestSuite(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockServer()
+        self.server.populate("graph-1", nodes=250, relationships=10)
+        self.graph = Graph("graph-1", auth="token",
+                           session=self.server.session())
+
+    def test_can_read_properties(self):
+        self.assertEqual(self.graph.name, "graph-1")
+
+    def test_can_pull_nodes(self):
+        nodes = self.graph.nodes["Node"]
+        nodes.pull()
+        self.assertEqual(len(nodes.data), 250)
+
+    def test_can_slice_nodes(self):
+        nodes = self.graph.nodes["Node"]
+        self.assertEqual(len(nodes[100:110]), 10)
+        self.assertEqual(nodes[5]["properties"]["p0"], 5)
+
+    def test_can_push_nodes(self):
+        nodes = self.graph.nodes["Node"]
+        nodes.add({"p0": 1000, "p1": "new"})
+        stats = nodes.push()
+        self.assertEqual(stats["elements"], 1)
+        self.assertEqual(self.graph.nodes["Node"].count(), 251)
+
+    def test_pushes_only_changed_properties(self):
+        nodes = self.graph.nodes["Node"]
+        nodes.pull()
+        node = nodes.get_by_id(nodes[3]["id"])
+        elements = self.server.graphs["graph-1"].elements["node"]["node"]
+        elements[node["id"]]["properties"]["p1"] = "changed by others"
+        node["properties"]["p0"] = 999
+        self.assertEqual(nodes.push()["updated"], 1)
+        self.assertEqual(elements[node["id"]]["properties"]["p0"], 999)
+        self.assertEqual(elements[node["id"]]["properties"]["p1"],
+                         "changed by others")
+        self.assertEqual(nodes.push()["updated"], 0)
+
+    def test_pushes_changes_to_streamed_nodes(self):
+        nodes = DataCollection(self.graph._api, NODE, "node", page_size=100)
+        for node in nodes:
+            if node["properties"]["p0"] < 3:
+                node["properties"]["p0"] = -1
+        node = next(nodes.filter(p0=200))
+        node["properties"]["p0"] = -2
+        self.assertEqual(len(nodes._pages), 0)
+        self.assertEqual(nodes.push()["updated"], 4)
+        self.assertEqual(len(list(nodes.filter(p0=-1))), 3)
+        self.assertEqual(len(list(nodes.filter(p0=-2))), 1)
+        self.assertEqual(nodes.push()["updated"], 0)
+
+    def test_tracks_changed_properties(self):
+        properties = Properties({"p0": 0, "p1": "a", "p2": "b"})
+        self.assertEqual(properties.changes(), {})
+        properties.update(p0=1)
+        properties.pop("p1")
+        properties.setdefault("p2", "c")
+        self.assertEqual(properties.changes(), {"p0": 1, "p1": None})
+        properties.clear()
+        self.assertEqual(properties.changes(),
+                         {"p0": None, "p1": None, "p2": None})
+
+    def test_can_resume_failed_pushes(self):
+        server = FailingMockServer()
+        server.populate("graph-1", nodes=0)
+        graph = Graph("graph-1", auth="token", session=server.session())
+        nodes = graph.nodes["Node"]
+        added = [nodes.add({"p0": index,
+                            "p1": "slow" if index == 0 else "new"})
+                 for index in range(10)]
+        failed = nodes.add({"p0": 10, "p1": "fail"})
+        progress = []
+        try:
+            nodes.push(chunk_size=3, workers=4,
+                       callback=lambda pushed, total: progress.append(
+                           (pushed, total)))
+        except PushError as e:
+            self.assertEqual(list(e.errors), [3])
+            self.assertEqual(e.stats["elements"], 9)
+            self.assertEqual(e.stats["chunks"], 3)
+            self.assertEqual(e.stats["failed"], 2)
+        else:
+            self.fail("PushError not raised")
+        self.assertEqual(progress, [(3, 11), (6, 11), (9, 11)])
+        self.assertEqual([node["properties"]["p0"] for node in nodes._to_add],
+                         [9, 10])
+        # IDs follow the order of the chunks, even if finished out of order
+        elements = server.graphs["graph-1"].elements["node"]["node"]
+        self.assertEqual(len(elements), 9)
+        for node in added[:9]:
+            self.assertEqual(elements[node["id"]]["properties"]["p0"],
+                             node["properties"]["p0"])
+        failed["properties"]["p1"] = "fixed"
+        stats = nodes.push(chunk_size=3)
+        self.assertEqual((stats["elements"], stats["failed"]), (2, 0))
+        self.assertEqual(nodes._to_add, [])
+        self.assertEqual(len(elements), 11)
+        self.assertEqual(elements[failed["id"]]["properties"]["p1"], "fixed")
+
+    def test_can_lookup_changed_nodes(self):
+        nodes = self.graph.nodes["Node"]
+        nodes.create_index("p0")
+        self.assertEqual(len(nodes.lookup("p0", 3)), 1)
+        nodes[3]["properties"]["p0"] = 999
+        self.assertEqual(nodes.push()["updated"], 1)
+        self.assertEqual(nodes.lookup("p0", 999), [nodes[3]])
+        self.assertEqual(nodes.lookup("p0", 3), [])
+
+    def test_can_lookup_ranges_of_nodes(self):
+        nodes = self.graph.nodes["Node"]
+        nodes.create_index("p0", ordered=True)
+        nodes.create_index("p1")
+        self.assertEqual([node["properties"]["p0"]
+                          for node in nodes.lookup_range("p0", 10, 12)],
+                         [10, 11, 12])
+        nodes.add({"p0": 11})
+        self.assertEqual(len(nodes.lookup_range("p0", 10, 12)), 4)
+        self.assertEqual(len(nodes.lookup_range("p0", end=1)), 2)
+        self.assertRaises(TypeError, nodes.lookup_range, "p1")
+        nodes.drop_index("p0")
+        self.assertRaises(KeyError, nodes.lookup, "p0", 10)
+
+    def test_index_skips_unhashable_values(self):
+        index = Index("p0", ordered=True)
+        first = {"properties": {"p0": [1]}}
+        second = {"properties": {"p0": "a"}}
+        for element in (first, second, {"properties": {}}):
+            index.add(element)
+        self.assertEqual(index.lookup([1]), [])
+        self.assertEqual(index.lookup("a"), [second])
+        self.assertEqual(index.range(), [second])
+        index.discard(second, "a")
+        self.assertEqual(index.lookup("a"), [])
+
+    def test_can_pull_changes_seen_by_other_collections(self):
+        nodes = DataCollection(self.graph._api, NODE, "node")
+        nodes.pull()
+        others = DataCollection(self.graph._api, NODE, "node")
+        others.add({"p0": 1000})
+        others.push()
+        others.pull()
+        nodes.pull()
+        self.assertEqual(len(nodes), 251)
+
+    def test_can_iterate_nodes_when_paging_is_ignored(self):
+        server = UnpagedMockServer()
+        server.populate("graph-1", nodes=10)
+        graph = Graph("graph-1", auth="token", session=server.session())
+        nodes = DataCollection(graph._api, NODE, "node", page_size=10)
+        self.assertEqual(len(list(nodes.iter())), 10)
+        self.assertEqual(nodes._total, 10)
+
+    def test_can_filter_nodes_when_paging_is_ignored(self):
+        server = UnpagedMockServer()
+        server.populate("graph-1", nodes=10)
+        graph = Graph("graph-1", auth="token", session=server.session())
+        nodes = DataCollection(graph._api, NODE, "node", page_size=10)
+        self.assertEqual(len(list(nodes.filter(params={}))), 10)
+
+    def test_pull_drops_local_changes(self):
+        nodes = DataCollection(self.graph._api, NODE, "node")
+        nodes.pull()
+        nodes[3]["properties"]["p0"] = 999
+        nodes.pull()
+        self.assertEqual(nodes[3]["properties"]["p0"], 3)
+        self.assertEqual(nodes.push()["updated"], 0)
+        elements = self.server.graphs["graph-1"].elements["node"]["node"]
+        self.assertEqual(elements[nodes[3]["id"]]["properties"]["p0"], 3)
+
+    def test_only_pulls_keep_validators(self):
+        nodes = DataCollection(self.graph._api, NODE, "node", page_size=10)
+        list(nodes.iter())
+        self.assertEqual(nodes._validators, {})
+        nodes.pull()
+        self.assertEqual(len(nodes._validators), 1)
+
+    def test_caches_types_per_server(self):
+        self.assertIn("Node", self.graph.nodes.types)
+        server = MockServer()
+        server.populate("graph-1", nodes=1, nodetype="Other")
+        graph = Graph("graph-1", auth="token", session=server.session())
+        self.assertEqual([_type["name"] for _type in graph.nodes.types],
+                         ["Other"])
+        self.assertEqual(len(graph.nodes["Other"]), 1)
+
+    def test_can_change_pushed_columnar_nodes(self):
+        graph = Graph("graph-1", auth="token", session=self.server.session(),
+                      columnar=True)
+        nodes = graph.nodes["Node"]
+        nodes.pull()
+        node = nodes.add({"p0": 1000, "p1": "new"})
+        nodes.push()
+        node["properties"]["p0"] = 1001
+        self.assertEqual(nodes.push()["updated"], 1)
+        elements = self.server.graphs["graph-1"].elements["node"]["node"]
+        self.assertEqual(elements[node["id"]]["properties"]["p0"], 1001)
+
+    def test_pulls_columnar_nodes_page_by_page(self):
+        nodes = DataCollection(self.graph._api, NODE, "node", page_size=100,
+                               columnar=True)
+        nodes.properties.pull()
+        requests = self.server.requests
+        nodes.pull()
+        self.assertEqual(self.server.requests - requests, 3)
+        self.assertEqual(len(nodes), 250)
+        self.assertEqual(nodes[249]["properties"]["p0"], 249)
+        store = nodes.data
+        nodes.pull()
+        self.assertIs(nodes.data, store)
+        elements = self.server.graphs["graph-1"].elements["node"]["node"]
+        elements[nodes[150]["id"]]["properties"]["p0"] = -1
+        nodes.pull()
+        self.assertEqual(nodes[150]["properties"]["p0"], -1)
+        self.assertEqual(nodes[50]["properties"]["p0"], 50)
+        self.assertEqual(len(nodes), 250)
+
+    def test_can_refer_to_columnar_nodes(self):
+        graph = Graph("graph-1", auth="token", session=self.server.session(),
+                      columnar=True)
+        nodes = graph.nodes["Node"]
+        nodes.pull()
+        links = graph.relationships["Link"]
+        links.add({"source_id": nodes[0], "target_id": nodes[1]})
+        stats = graph.push_all()
+        self.assertEqual(stats["relationships"]["link"]["elements"], 1)
+        self.assertEqual(links[-1]["properties"]["source_id"],
+                         nodes[0]["id"])
+        self.assertEqual(links[-1]["properties"]["target_id"],
+                         nodes[1]["id"])
+
+    def test_can_filter_nodes(self):
+        nodes = self.graph.nodes["Node"]
+        self.assertEqual(len(list(nodes.filter(p0=3))), 1)
+
+    def test_can_export_and_import(self):
+        exported = io.BytesIO()
+        self.graph.export_to(exported)
+        exported.seek(0)
+        self.assertEqual(len(list(read_export(exported))), 260)
+        self.server.create_graph("graph-2")
+        graph = Graph("graph-2", auth="token", session=self.server.session())
+        exported.seek(0)
+        graph.import_from(exported)
+        self.assertEqual(len(graph.nodes["Node"]), 250)
+
+    def test_can_push_compressed_nodes(self):
+        self.graph._api._session.compression = Compression(threshold=0)
+        nodes = self.graph.nodes["Node"]
+        nodes.add({"p0": 1000, "p1": "new"})
+        nodes.push()
+        self.assertEqual(self.graph.nodes["Node"].count(), 251)
+
+    def test_can_push_a_batch(self):
+        with self.graph.batch(chunk_size=10) as stats:
+            self.graph.nodes.types.add({"name": "Person"})
+            people = self.graph.nodes["Person"]
+            people.properties.add({"key": "name", "datatype": "string"})
+            links = self.graph.relationships["Link"]
+            first = people.add({"name": "first"})
+            second = people.add({"name": "second"})
+            links.add({"source_id": first, "target_id": second})
+        self.assertEqual(stats["nodes"]["person"]["elements"], 2)
+        self.assertEqual(links[-1]["properties"]["source_id"], first["id"])
+        self.assertEqual(len(self.graph.nodes["person"].properties), 1)
+
+    def test_can_push_the_readme_batch(self):
+        graph = self.graph
+        with graph.batch() as stats:
+            graph.nodes.types.add({"name": "Person"})
+            people = graph.nodes["Person"]
+            people.properties.add({"key": "Name", "datatype": "string"})
+            alice = people.add({"Name": "Alice"})
+            bob = people.add({"Name": "Bob"})
+            graph.relationships.types.add(
+                {"name": "Knows", "source": "Person", "target": "Person"})
+            graph.relationships["Knows"].add(
+                {"source_id": alice, "target_id": bob})
+            graph.relationships["Knows"].add(
+                {"source_id": bob["id"], "target_id": alice["id"]})
+        self.assertEqual(stats["nodes"]["person"]["elements"], 2)
+        self.assertEqual(stats["relationships"]["knows"]["elements"], 2)
+        knows = self.server.graphs["graph-1"].types["relationship"]["knows"]
+        self.assertEqual((knows["source"], knows["target"]),
+                         ("person", "person"))
+
+    def test_can_refer_to_temporary_ids(self):
+        nodes = self.graph.nodes["Node"]
+        links = self.graph.relationships["Link"]
+        first = nodes.add({"p0": 1000})["id"]
+        second = nodes.add({"p0": 1001})["id"]
+        links.add({"source_id": first, "target_id": second})
+        stats = self.graph.push_all(chunk_size=1)
+        self.assertEqual(stats["relationships"]["link"]["elements"], 1)
+        self.assertEqual(links[-1]["properties"]["source_id"], first.id)
+        self.assertEqual(links[-1]["properties"]["target_id"], second.id)
+
+    def test_can_lookup_pushed_references(self):
+        nodes = self.graph.nodes["Node"]
+        links = self.graph.relationships["Link"]
+        links.create_index("source_id")
+        links.create_index("target_id")
+        node = nodes.add({"p0": 1000})
+        links.add({"source_id": node, "target_id": node["id"]})
+        self.assertEqual(links.lookup("source_id", node), [])
+        self.assertEqual(len(links.lookup("target_id", node["id"])), 1)
+        self.graph.push_all()
+        self.assertEqual(len(links.lookup("source_id", node["id"])), 1)
+        self.assertEqual(len(links.lookup("target_id", node["id"])), 1)
+
+    def test_can_run_benchmarks(self):
+        results = benchmarks.run(size=50, repeat=1)
+        self.assertEqual(list(results), list(benchmarks.BENCHMARKS))
+        self.assertFalse(benchmarks.compare(results, results))
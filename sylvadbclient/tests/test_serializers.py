@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from slumber import serialize
+
+from sylvadbclient import API
+from sylvadbclient.api import NODE, DataCollection
+from sylvadbclient.mock import MockServer
+from sylvadbclient.serializers import (
+    BACKENDS, JsonSerializer, available_backend, get_serializer, materialize,
+)
+
+DATA = {"nodes": [{"id": 1, "properties": {"name": u"ñandú", "p0": 1.5}}]}
+
+
+def installed(name):
+    try:
+        JsonSerializer(name)
+    except ImportError:
+        return False
+    return True
+
+
+class SerializerTestSuite(unittest.TestCase):
+
+    def test_backends_round_trip(self):
+        for name in BACKENDS:
+            if not installed(name):
+                continue
+            serializer = JsonSerializer(name)
+            data = serializer.dumps(DATA)
+            if not isinstance(data, bytes):
+                data = data.encode("utf-8")
+            self.assertEqual(serializer.loads(data), DATA, name)
+
+    def test_uses_an_available_backend(self):
+        self.assertIn(available_backend(), BACKENDS)
+        self.assertEqual(JsonSerializer().backend, available_backend())
+        self.assertRaises(ValueError, JsonSerializer, "yaml")
+
+    def test_can_get_serializers(self):
+        serializer = get_serializer("json")
+        self.assertIsInstance(serializer, serialize.Serializer)
+        self.assertIs(get_serializer(serializer), serializer)
+        self.assertEqual(serializer.get_serializer().backend, "json")
+
+    @unittest.skipIf(not installed("simdjson"), "simdjson is not installed")
+    def test_decodes_large_responses_lazily(self):
+        serializer = JsonSerializer("json", lazy=True, lazy_threshold=10)
+        self.assertTrue(serializer.lazy)
+        value = serializer.loads(serializer.dumps(DATA).encode("utf-8"))
+        self.assertNotIsInstance(value, dict)
+        self.assertEqual(materialize(value), DATA)
+        small = serializer.loads(b"{}")
+        self.assertEqual(materialize(small), {})
+
+    def test_can_use_a_backend_with_the_api(self):
+        server = MockServer()
+        server.populate("graph-1", nodes=1)
+        for name in BACKENDS:
+            if not installed(name):
+                continue
+            api = API("token", graph_slug="graph-1", serializer=name,
+                      session=server.session())
+            nodes = DataCollection(api, NODE, "node")
+            nodes.add({"name": name})
+            nodes.push()
+            nodes.pull()
+            self.assertEqual(nodes[-1]["properties"]["name"], name)
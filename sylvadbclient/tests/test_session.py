@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+import io
+import time
+import unittest
+from email.utils import formatdate
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from sylvadbclient import RateLimiter, RetryPolicy, new_session
+from sylvadbclient.session import IDEMPOTENCY_HEADER, Session
+
+URL = "http://sylvadb.test/api/graphs/"
+
+
+class FakeAdapter(BaseAdapter):
+    """
+    Transport adapter answering with the `answers` in order: a status code,
+    a tuple of status code and headers, or an exception to raise
+    """
+
+    def __init__(self, *answers):
+        super(FakeAdapter, self).__init__()
+        self.answers = list(answers)
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        answer = self.answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        status, headers = answer if isinstance(answer, tuple) else (answer,
+                                                                    {})
+        response = requests.Response()
+        response.status_code = status
+        response.url = request.url
+        response.request = request
+        response.headers = CaseInsensitiveDict(headers)
+        response.raw = io.BytesIO(b"")
+        return response
+
+    def close(self):
+        pass
+
+
+class RecordingRateLimiter(RateLimiter):
+    """Rate limiter recording the pauses asked"""
+
+    def __init__(self, *args, **kwargs):
+        super(RecordingRateLimiter, self).__init__(*args, **kwargs)
+        self.pauses = []
+
+    def pause(self, seconds):
+        self.pauses.append(seconds)
+        super(RecordingRateLimiter, self).pause(seconds)
+
+
+class SessionTestSuite(unittest.TestCase):
+
+    def session(self, *answers, **kwargs):
+        self.adapter = FakeAdapter(*answers)
+        session = new_session()
+        session.mount("http://sylvadb.test", self.adapter)
+        kwargs.setdefault("retry", RetryPolicy(backoff=0.001))
+        return Session(session, **kwargs)
+
+    def test_retries_unavailable_server(self):
+        session = self.session(503, 503, 200)
+        response = session.request("GET", URL)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.adapter.requests), 3)
+
+    def test_returns_last_response_when_retries_run_out(self):
+        session = self.session(503, 503, 503,
+                               retry=RetryPolicy(retries=2, backoff=0.001))
+        response = session.request("GET", URL)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(len(self.adapter.requests), 3)
+
+    def test_does_not_retry_post_without_idempotency_key(self):
+        session = self.session(503, 200)
+        response = session.request("POST", URL, data="{}")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(len(self.adapter.requests), 1)
+
+    def test_retries_post_with_the_same_idempotency_key(self):
+        session = self.session(503, 200, retry=RetryPolicy(
+            backoff=0.001, idempotency_keys=True))
+        response = session.request("POST", URL, data="{}")
+        self.assertEqual(response.status_code, 200)
+        keys = [request.headers[IDEMPOTENCY_HEADER]
+                for request in self.adapter.requests]
+        self.assertEqual(len(keys), 2)
+        self.assertEqual(keys[0], keys[1])
+
+    def test_retries_connection_errors(self):
+        session = self.session(requests.ConnectionError(), 200)
+        self.assertEqual(session.request("GET", URL).status_code, 200)
+        session = self.session(requests.ConnectionError(), 200)
+        self.assertRaises(requests.ConnectionError, session.request, "POST",
+                          URL, data="{}")
+
+    def test_does_not_retry_without_policy(self):
+        session = self.session(503, 200, retry=None)
+        self.assertEqual(session.request("GET", URL).status_code, 503)
+        session = self.session(requests.Timeout(), 200, retry=None)
+        self.assertRaises(requests.Timeout, session.request, "GET", URL)
+
+    def test_retries_too_many_requests_after_retry_after(self):
+        limiter = RecordingRateLimiter(1000)
+        session = self.session((429, {"Retry-After": "0.01"}), 200,
+                               rate_limiter=limiter)
+        response = session.request("POST", URL, data="{}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.adapter.requests), 2)
+        self.assertEqual(limiter.pauses, [0.01])
+
+    def test_can_read_retry_after(self):
+        response = requests.Response()
+        response.headers = CaseInsensitiveDict({"Retry-After": "2"})
+        self.assertEqual(RetryPolicy.retry_after(response), 2)
+        response.headers["Retry-After"] = formatdate(time.time() + 60)
+        self.assertTrue(50 < RetryPolicy.retry_after(response) <= 60)
+        response.headers["Retry-After"] = "soon"
+        self.assertEqual(RetryPolicy.retry_after(response), None)
+        self.assertEqual(RetryPolicy.retry_after(None), None)
+
+    def test_backoff_is_capped(self):
+        retry = RetryPolicy(backoff=1, max_backoff=2)
+        for attempt in range(5):
+            self.assertTrue(0 <= retry.delay(attempt) <= 2)
+
+
+class RateLimiterTestSuite(unittest.TestCase):
+
+    def test_allows_bursts(self):
+        limiter = RateLimiter(1, burst=3)
+        start = time.time()
+        for _ in range(3):
+            limiter.acquire()
+        self.assertTrue(time.time() - start < 0.5)
+
+    def test_waits_for_tokens(self):
+        limiter = RateLimiter(50, burst=1)
+        start = time.time()
+        for _ in range(3):
+            limiter.acquire()
+        self.assertTrue(time.time() - start >= 0.03)
+
+    def test_pause_holds_requests(self):
+        limiter = RateLimiter(1000)
+        limiter.pause(0.05)
+        start = time.time()
+        limiter.acquire()
+        self.assertTrue(time.time() - start >= 0.04)